@@ -1,6 +1,5 @@
-from dm_control import suite
-
 from .registry import EnvSpec, register, registry
+from .tasks import ALL_TASKS
 
 ALL_ENVS = []
 
@@ -9,23 +8,58 @@ def make(*args, **kwargs):
     return registry.make(*args, **kwargs)
 
 
+def make_vec(eid: str, num_envs: int, vectorization="sync", **kwargs):
+    """Make a vector environment with `num_envs` copies of the task `eid`.
+
+    Usage::
+
+        env = gym_dmc.make_vec("dmc:Walker-walk-v1", num_envs=64, frame_skip=4)
+        obs = env.reset()  # shape (64, 24)
+    """
+    from functools import partial
+
+    env_fns = [partial(make, eid, **kwargs) for _ in range(num_envs)]
+
+    if vectorization == "sync":
+        from gym_dmc.vector import SyncVectorEnv
+
+        return SyncVectorEnv(env_fns)
+    elif vectorization == "subproc":
+        from gym_dmc.vector import SubprocVectorEnv
+
+        return SubprocVectorEnv(env_fns)
+    elif vectorization == "thread":
+        from gym_dmc.vector import ThreadVectorEnv
+
+        return ThreadVectorEnv(env_fns)
+    raise ValueError(f"Unknown vectorization mode `{vectorization}`")
+
+
 def make_env(
     eid: str,
     flatten_obs=True,
     from_pixels=False,
     frame_skip=1,
     episode_frames=1000,
+    obs_keys=None,
+    frame_stack=None,
+    perf_stats=False,
     **kwargs,
 ):
     max_episode_steps = episode_frames / frame_skip
 
     from gym_dmc.dmc_env import DMCEnv
 
-    env = DMCEnv(from_pixels=from_pixels, frame_skip=frame_skip, **kwargs)
+    if from_pixels and obs_keys is None:
+        # only the pixels are returned below, so skip computing the state observations.
+        obs_keys = ("pixels",)
+
+    env = DMCEnv(from_pixels=from_pixels, frame_skip=frame_skip, obs_keys=obs_keys, **kwargs)
 
     # This spec object gets picked up by the gym.EnvSpecs constructor
     # used in gym.registration.EnvSpec.make, L:93 to generate the spec
     if eid:
+        domain_name, task_name = kwargs["domain_name"], kwargs["task_name"]
         env._spec = EnvSpec(
             id_requested=f"{domain_name.capitalize()}-{task_name}-v1",
             max_episode_steps=max_episode_steps,
@@ -39,10 +73,21 @@ def make_env(
         from gym_dmc.wrappers.flat import FlattenObservation
 
         env = FlattenObservation(env)
+
+    if frame_stack:
+        from gym_dmc.wrappers.frame_stack import FrameStack
+
+        env = FrameStack(env, frame_stack)
+
+    if perf_stats:
+        from gym_dmc.perf import enable_perf_stats
+
+        enable_perf_stats(env)
     return env
 
 
-for domain_name, task_name in suite.ALL_TASKS:
+# dm_control is only imported once `make_env` builds an environment.
+for domain_name, task_name in ALL_TASKS:
     ID = f"{domain_name.capitalize()}-{task_name}-v1"
 
     ALL_ENVS.append(ID)
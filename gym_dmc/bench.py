@@ -0,0 +1,167 @@
+"""Throughput benchmark of the registered tasks.
+
+For every task, observation mode and frame_skip, measures the env steps per second and the latency of
+`reset`, and writes the results as JSON. With `--baseline`, the results are compared against an
+earlier run, and the run fails when a config got slower than `--threshold`.
+
+Usage::
+
+    python -m gym_dmc.bench --output baseline.json
+    python -m gym_dmc.bench --envs "Walker-*" "Cheetah-*" --modes state pixels --baseline baseline.json
+
+Pixel modes need a rendering backend, e.g. `MUJOCO_GL=egl`.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+MODES = {
+    "state": dict(),
+    "pixels": dict(from_pixels=True),
+    "gray": dict(from_pixels=True, gray_scale=True),
+}
+
+
+def bench_env(eid, mode="state", frame_skip=1, steps=200, resets=5, seed=0, warmup=10):
+    """Steps per second of `env.step` with uniformly random actions, and the mean `reset` latency.
+
+    Resets at the end of an episode are part of the stepping time, as they would be in training. The
+    first `warmup` steps are not timed.
+    """
+    import gym_dmc
+
+    env = gym_dmc.make(f"dmc:{eid}", frame_skip=frame_skip, **MODES[mode])
+    env.seed(seed)
+    env.action_space.seed(seed)
+    actions = [env.action_space.sample() for _ in range(steps)]
+
+    env.reset()
+    for action in actions[:warmup]:
+        env.step(action)
+
+    start = time.perf_counter()
+    for _ in range(resets):
+        env.reset()
+    reset_time = (time.perf_counter() - start) / resets
+
+    start = time.perf_counter()
+    for action in actions:
+        _, _, done, _ = env.step(action)
+        if done:
+            env.reset()
+    step_time = time.perf_counter() - start
+    env.close()
+
+    return dict(
+        env=eid,
+        mode=mode,
+        frame_skip=frame_skip,
+        steps_per_sec=steps / step_time,
+        frames_per_sec=steps * frame_skip / step_time,
+        reset_ms=reset_time * 1e3,
+    )
+
+
+def _key(result):
+    return result["env"], result["mode"], result["frame_skip"]
+
+
+def compare(results, baseline, threshold=0.2):
+    """The results that are more than `threshold` slower than the same config in `baseline`, as
+    `(result, baseline_result, reasons)`. Configs missing from the baseline are skipped."""
+    previous = {_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in results["results"]:
+        before = previous.get(_key(result))
+        if before is None:
+            continue
+        reasons = []
+        if result["steps_per_sec"] < before["steps_per_sec"] * (1 - threshold):
+            reasons.append(f"steps/s {before['steps_per_sec']:.0f} -> {result['steps_per_sec']:.0f}")
+        if result["reset_ms"] > before["reset_ms"] * (1 + threshold):
+            reasons.append(f"reset {before['reset_ms']:.2f}ms -> {result['reset_ms']:.2f}ms")
+        if reasons:
+            regressions.append((result, before, reasons))
+    return regressions
+
+
+def environment_info():
+    from importlib.metadata import version
+
+    import mujoco
+
+    return dict(
+        python=platform.python_version(),
+        platform=platform.platform(),
+        processor=platform.processor(),
+        cpu_count=os.cpu_count(),
+        numpy=np.__version__,
+        mujoco=mujoco.__version__,
+        dm_control=version("dm_control"),
+        mujoco_gl=os.environ.get("MUJOCO_GL"),
+        time=time.strftime("%Y-%m-%dT%H:%M:%S"),
+    )
+
+
+def run(envs, modes=("state",), frame_skips=(1,), steps=200, resets=5, seed=0, log=None):
+    results = []
+    for eid in envs:
+        for mode in modes:
+            for frame_skip in frame_skips:
+                result = bench_env(eid, mode, frame_skip, steps=steps, resets=resets, seed=seed)
+                results.append(result)
+                if log:
+                    print(
+                        f"{eid:32s} {mode:6s} frame_skip={frame_skip:<2d} "
+                        f"{result['steps_per_sec']:8.0f} steps/s {result['reset_ms']:8.2f} ms/reset",
+                        file=log,
+                    )
+    return dict(meta=environment_info(), results=results)
+
+
+def main(argv=None):
+    from gym_dmc import ALL_ENVS
+
+    parser = argparse.ArgumentParser(prog="python -m gym_dmc.bench", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--envs", nargs="+", default=["*"], help="env ids or patterns, e.g. 'Walker-*'")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    parser.add_argument("--frame-skips", nargs="+", type=int, default=[1, 4])
+    parser.add_argument("--steps", type=int, default=200, help="env steps per config")
+    parser.add_argument("--resets", type=int, default=5, help="resets per config")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    envs = [eid for eid in ALL_ENVS if any(fnmatch.fnmatch(eid, pattern) for pattern in args.envs)]
+    if not envs:
+        parser.error(f"no env matches {args.envs}")
+
+    results = run(envs, args.modes, args.frame_skips, steps=args.steps, resets=args.resets, seed=args.seed, log=sys.stderr)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for result, _, reasons in regressions:
+            print(f"REGRESSION {' '.join(map(str, _key(result)))}: {', '.join(reasons)}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Microbenchmarks of the hot functions of `gym_dmc.gym.spaces`.
+
+Writes the time per call of each case as JSON. With `--baseline`, the results are compared against an
+earlier run, and the run fails when a case got slower than `--threshold`.
+
+Usage::
+
+    python -m gym_dmc.bench_spaces --output spaces.json
+    python -m gym_dmc.bench_spaces --baseline spaces.json
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from collections import OrderedDict
+
+import numpy as np
+
+from gym_dmc.gym import spaces
+
+
+def _walker_observation_space():
+    return spaces.Dict(
+        OrderedDict(
+            orientations=spaces.Box(-np.inf, np.inf, shape=(14,), dtype=np.float64),
+            height=spaces.Box(-np.inf, np.inf, shape=(), dtype=np.float64),
+            velocity=spaces.Box(-np.inf, np.inf, shape=(9,), dtype=np.float64),
+        )
+    )
+
+
+def cases():
+    """{name: function} of the benchmarked calls."""
+    action = spaces.Box(-1.0, 1.0, shape=(6,), dtype=np.float32, seed=0)
+    mixed = spaces.Box(
+        low=np.array([-1.0, -np.inf, 0.0, -np.inf] * 6),
+        high=np.array([1.0, np.inf, np.inf, 0.0] * 6),
+        dtype=np.float64,
+        seed=0,
+    )
+    pixels = spaces.Box(0, 255, shape=(3, 84, 84), dtype=np.uint8, seed=0)
+    observation = _walker_observation_space()
+    tuple_space = spaces.Tuple((spaces.Box(-1.0, 1.0, shape=(4,)), spaces.Discrete(5), spaces.MultiBinary(3)))
+    multi_discrete = spaces.MultiDiscrete([5, 2, 2, 7])
+
+    a, obs, tup, md = action.sample(), observation.sample(), tuple_space.sample(), multi_discrete.sample()
+    flat_obs, flat_tup, flat_md = (spaces.flatten(s, x) for s, x in [(observation, obs), (tuple_space, tup), (multi_discrete, md)])
+    obs_batch = observation.sample(1000)
+    flat_obs_batch = spaces.batch_flatten(observation, obs_batch)
+
+    return {
+        "Box.sample[bounded (6,)]": action.sample,
+        "Box.sample[mixed (24,)]": mixed.sample,
+        "Box.sample[uint8 (3, 84, 84)]": pixels.sample,
+        "Box.contains[(6,)]": lambda: action.contains(a),
+        "flatdim[Dict]": lambda: spaces.flatdim(observation),
+        "flatten[Dict]": lambda: spaces.flatten(observation, obs),
+        "unflatten[Dict]": lambda: spaces.unflatten(observation, flat_obs),
+        "flatten[Tuple]": lambda: spaces.flatten(tuple_space, tup),
+        "unflatten[Tuple]": lambda: spaces.unflatten(tuple_space, flat_tup),
+        "flatten[MultiDiscrete]": lambda: spaces.flatten(multi_discrete, md),
+        "unflatten[MultiDiscrete]": lambda: spaces.unflatten(multi_discrete, flat_md),
+        "Box.sample[n=1000 (6,)]": lambda: action.sample(1000),
+        "batch_flatten[Dict n=1000]": lambda: spaces.batch_flatten(observation, obs_batch),
+        "batch_unflatten[Dict n=1000]": lambda: spaces.batch_unflatten(observation, flat_obs_batch),
+    }
+
+
+def run(names=None, repeat=5, number=2000, log=None):
+    from gym_dmc.bench import environment_info
+
+    results = []
+    for name, fn in cases().items():
+        if names and name not in names:
+            continue
+        # the best of `repeat` is the least noisy estimate of the cost of the call.
+        seconds = min(timeit.repeat(fn, repeat=repeat, number=number)) / number
+        results.append(dict(name=name, us_per_call=seconds * 1e6))
+        if log:
+            print(f"{name:32s} {seconds * 1e6:8.2f} us", file=log)
+    return dict(meta=environment_info(), results=results)
+
+
+def compare(results, baseline, threshold=0.2):
+    """The cases that are more than `threshold` slower than in `baseline`, as (result, baseline_result)."""
+    previous = {result["name"]: result for result in baseline["results"]}
+    return [
+        (result, previous[result["name"]])
+        for result in results["results"]
+        if result["name"] in previous and result["us_per_call"] > previous[result["name"]]["us_per_call"] * (1 + threshold)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m gym_dmc.bench_spaces", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--cases", nargs="+", help="names of the cases to run, defaults to all of them")
+    parser.add_argument("--number", type=int, default=2000, help="calls per timing")
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    results = run(args.cases, number=args.number, log=sys.stderr)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for result, before in regressions:
+            print(f"REGRESSION {result['name']}: {before['us_per_call']:.2f}us -> {result['us_per_call']:.2f}us", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,21 @@
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from collections.abc import MutableMapping
+from functools import partial
+
+import mujoco
 import numpy as np
-from dm_control import suite
+from dm_control.rl import control
 from dm_env import specs
 from numpy.typing import NDArray
 
 from .gym import spaces
 from .gym.core import Env
+from .model_cache import MUTATES_MODEL
+from .model_cache import load as model_cache_load
+from .multiview import MODALITIES
+from .pixels import PixelPipeline, to_gray
 
 
 def convert_dm_control_to_gym_space(dm_control_space, dtype=None, **kwargs):
@@ -32,7 +43,84 @@ def convert_dm_control_to_gym_space(dm_control_space, dtype=None, **kwargs):
         return space
 
 
+class LazyInfo(MutableMapping):
+    """Info dict whose diagnostics are only computed when they are read.
+
+    `getters` maps each lazy key to a function of no arguments. The value is
+    computed on first access and then kept. The env expires the entries that
+    were never read on its next `step`, `reset` or `set_state`, because the
+    state they describe is gone. Reading one after that raises `KeyError`.
+    Pickling (e.g. sending the info to another process) computes every entry
+    that has not expired.
+    """
+
+    def __init__(self, getters=None, **kwargs):
+        self._data = dict(kwargs)
+        self._getters = dict(getters or {})
+        self._expired = ()
+
+    def expire(self):
+        self._expired = tuple(self._getters)
+        self._getters.clear()
+
+    def __getitem__(self, key):
+        if key in self._data:
+            return self._data[key]
+        if key in self._getters:
+            value = self._data[key] = self._getters.pop(key)()
+            return value
+        if key in self._expired:
+            raise KeyError(f"`{key}` is only available until the next step() or reset() of the env.")
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self._getters.pop(key, None)
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        if key in self._getters:
+            del self._getters[key]
+        else:
+            del self._data[key]
+
+    def __contains__(self, key):
+        return key in self._data or key in self._getters
+
+    def __iter__(self):
+        yield from list(self._data)
+        yield from list(self._getters)
+
+    def __len__(self):
+        return len(self._data) + len(self._getters)
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+    def __repr__(self):
+        items = [f"{k!r}: {v!r}" for k, v in self._data.items()] + [f"{k!r}: <lazy>" for k in self._getters]
+        return "LazyInfo({" + ", ".join(items) + "})"
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """The full state of a `DMCEnv`, see `DMCEnv.snapshot`."""
+
+    physics_state: NDArray  # mj_getState with mjSTATE_INTEGRATION
+    step_count: int
+    reset_next_step: bool
+    # the task RNG and read-only copies of the model fields that the task randomizes. Both only change
+    # on reset, so they are shared by all snapshots of an episode.
+    random_state: tuple
+    model_fields: dict
+
+
 class DMCEnv(Env):
+    # diagnostics that can be requested through `info_keys`. They are computed lazily.
+    INFO_GETTERS = {
+        "sim_state": lambda env: env.env.physics.get_state(),
+        "time": lambda env: env.env.physics.data.time,
+    }
+
     _spec = None
 
     @property
@@ -65,10 +153,25 @@ class DMCEnv(Env):
         non_newtonian=False,
         skip_start=None,  # useful in Manipulator for letting things settle
         space_dtype=None,  # default to float for consistency
+        info_keys=("sim_state",),  # diagnostics to add to the info dict, see `INFO_GETTERS`
+        obs_keys=None,  # observation entries to compute, including "pixels". Defaults to all of them.
+        crop=None,  # (top, left, height, width) window of the rendered frame for the pixel observation
+        resize=None,  # (height, width) to resize the pixel observation to
+        cameras=None,  # camera ids or names to render into a Dict of pixel observations
+        modalities=None,  # any of "rgb", "depth" and "segmentation", for each of the `cameras`
+        model_cache=None,  # directory of compiled models, defaults to $GYM_DMC_MODEL_CACHE. See `model_cache.py`
+        share_model=False,  # share one read-only MjModel between the envs of this task in the process
     ):
-        self.env = suite.load(
+        if share_model and no_gravity:
+            raise ValueError("`no_gravity` modifies the model, and can not be used with `share_model`.")
+        if share_model and visualize_reward:
+            raise ValueError("`visualize_reward` recolors the model on every step, and can not be used with `share_model`.")
+
+        self.env = model_cache_load(
             domain_name,
             task_name,
+            cache_dir=model_cache or os.environ.get("GYM_DMC_MODEL_CACHE"),
+            share_model=share_model,
             task_kwargs=task_kwargs,
             environment_kwargs=environment_kwargs,
             visualize_reward=visualize_reward,
@@ -82,14 +185,31 @@ class DMCEnv(Env):
         self.gray_scale = gray_scale
         self.channels_first = channels_first
         obs_spec = self.env.observation_spec()
+        if obs_keys is not None:
+            for key in obs_keys:
+                assert key in obs_spec or (key == "pixels" and from_pixels), f"`{key}` is not an observation of this task"
+            assert "pixels" in obs_keys or not from_pixels, "`obs_keys` needs to include `pixels` when `from_pixels=True`"
+            obs_spec = type(obs_spec)((key, value) for key, value in obs_spec.items() if key in obs_keys)
+        # the state observations to return, computed only when there is any.
+        self._state_keys = tuple(obs_spec.keys())
+        self._select_state_keys = obs_keys is not None
+
+        self.pixel_pipeline = PixelPipeline(height, width, gray_scale, channels_first, crop=crop, resize=resize)
+        # with `cameras` or `modalities`, the pixel observation is a Dict of all views, with keys like `depth_0`.
+        self.multi_view = cameras is not None or modalities is not None
+        self.cameras = tuple(cameras if cameras is not None else (camera_id,))
+        self.modalities = tuple(modalities or ("rgb",))
+        for modality in self.modalities:
+            assert modality in MODALITIES, f"`{modality}` is not one of the supported modalities {MODALITIES}"
+        self._multi_view_renderer = None
         if from_pixels:
-            color_dim = 1 if gray_scale else 3
-            image_shape = [color_dim, width, height] if channels_first else [width, height, color_dim]
-            self.observation_space = convert_dm_control_to_gym_space(
-                obs_spec,
-                dtype=space_dtype,
-                pixels=spaces.Box(low=0, high=255, shape=image_shape, dtype=np.uint8),
-            )
+            if self.multi_view:
+                pixel_space = spaces.Dict(
+                    {f"{modality}_{camera}": self._view_space(modality) for camera in self.cameras for modality in self.modalities}
+                )
+            else:
+                pixel_space = spaces.Box(low=0, high=255, shape=self.pixel_pipeline.shape, dtype=np.uint8)
+            self.observation_space = convert_dm_control_to_gym_space(obs_spec, dtype=space_dtype, pixels=pixel_space)
         else:
             self.observation_space = convert_dm_control_to_gym_space(obs_spec, dtype=space_dtype)
         self.action_space = convert_dm_control_to_gym_space(self.env.action_spec(), dtype=space_dtype)
@@ -111,6 +231,22 @@ class DMCEnv(Env):
 
         self.skip_start = skip_start
 
+        for key in info_keys:
+            assert key in self.INFO_GETTERS, f"`{key}` is not a supported info key, use one of {list(self.INFO_GETTERS)}"
+        self.info_keys = tuple(info_keys)
+        self._info = None
+        # rendered frames of the current physics state, keyed on the render arguments.
+        self._render_cache = {}
+        # the model fields that the task randomizes per episode, see `snapshot`.
+        self._model_fields_names = MUTATES_MODEL.get(domain_name, ())
+        self._episode_state = None
+        self._perf_stats = None  # see `gym_dmc.perf`
+        self._state_size = mujoco.mj_stateSize(self.env.physics.model.ptr, mujoco.mjtState.mjSTATE_INTEGRATION)
+
+    def perf_stats(self):
+        """The time spent in each phase of the steps, see `gym_dmc.perf`. None unless it is enabled."""
+        return None if self._perf_stats is None else self._perf_stats.summary()
+
     def turn_off_gravity(self):
         # note: specifically for manipulator, lets the object fall.
         self.env.physisc.body_mass[:-2] = 0
@@ -119,49 +255,263 @@ class DMCEnv(Env):
         self.action_space.seed(seed)
         return self.env.task.random.seed(seed)
 
+    def _expire_info(self):
+        if self._info is not None:
+            self._info.expire()
+            self._info = None
+
+    def _make_info(self):
+        if not self.info_keys:
+            return {}
+        self._info = LazyInfo({key: partial(self.INFO_GETTERS[key], self) for key in self.info_keys})
+        return self._info
+
     def set_state(self, state):
-        # note: missing the goal positions.
-        # self.env.physics.
+        """Set the physics state from `physics.get_state()`, or the `sim_state` info, without stepping.
+
+        This does not include the task state such as the target positions, use `snapshot` for that.
+        """
+        self._expire_info()
+        self.invalidate_render_cache()
         self.env.physics.set_state(state)
-        self.step([0])
+        self.env.physics.forward()
+
+    def snapshot(self) -> Snapshot:
+        """Capture the physics, the task and its RNG, so that `restore` continues exactly from here."""
+        env, physics = self.env, self.env.physics
+        if self._episode_state is None:
+            model_fields = {}
+            for name in self._model_fields_names:
+                value = getattr(physics.model, name).copy()
+                value.flags.writeable = False
+                model_fields[name] = value
+            # the suite tasks only draw from their RNG in `initialize_episode`, so like the model
+            # fields, it is captured once per episode. This is the slow part of a snapshot.
+            self._episode_state = env.task.random.get_state(), model_fields
+        random_state, model_fields = self._episode_state
+
+        physics_state = np.empty(self._state_size, np.float64)
+        mujoco.mj_getState(physics.model.ptr, physics.data.ptr, physics_state, mujoco.mjtState.mjSTATE_INTEGRATION)
+        return Snapshot(
+            physics_state=physics_state,
+            random_state=random_state,
+            step_count=env._step_count,
+            reset_next_step=env._reset_next_step,
+            model_fields=model_fields,
+        )
+
+    def restore(self, snapshot: Snapshot):
+        """Return to a `snapshot` of this env. This does not step the simulation."""
+        env, physics = self.env, self.env.physics
+        self._expire_info()
+        self.invalidate_render_cache()
+
+        if self._episode_state is None or snapshot.random_state is not self._episode_state[0]:
+            env.task.random.set_state(snapshot.random_state)
+            for name, value in snapshot.model_fields.items():
+                getattr(physics.model, name)[:] = value
+            if "hfield_data" in snapshot.model_fields and physics.contexts:
+                with physics.contexts.gl.make_current() as ctx:
+                    for hfield_id in range(physics.model.nhfield):
+                        ctx.call(mujoco.mjr_uploadHField, physics.model.ptr, physics.contexts.mujoco.ptr, hfield_id)
+            self._episode_state = snapshot.random_state, snapshot.model_fields
+
+        mujoco.mj_setState(physics.model.ptr, physics.data.ptr, snapshot.physics_state, mujoco.mjtState.mjSTATE_INTEGRATION)
+        physics.forward()
+        env._step_count = snapshot.step_count
+        env._reset_next_step = snapshot.reset_next_step
+
+    def rollout(self, snapshot: Snapshot, action_sequences, return_obs=False):
+        """Evaluate K open-loop action sequences of length H, all starting from `snapshot`.
+
+        Each sequence is stepped with the physics of `step`, but without building a `TimeStep` or the
+        observations, unless `return_obs`. Episode ends within the horizon are ignored. The env is left at
+        `snapshot`.
+
+        Usage::
+
+            snapshot = env.unwrapped.snapshot()
+            rewards = env.unwrapped.rollout(snapshot, actions)  # actions: (K, H, *action_shape)
+
+        Args:
+            snapshot: from `self.snapshot()`
+            action_sequences: array of shape (K, H, *action_space.shape)
+            return_obs: also return the observation after each action, with leading dimensions (K, H)
+
+        Returns:
+            rewards of shape (K, H), or (rewards, observations) with `return_obs`.
+        """
+        action_sequences = np.asarray(action_sequences, dtype=np.float64)
+        num_sequences, horizon = action_sequences.shape[:2]
+        actions = action_sequences.reshape(num_sequences, horizon, -1)
+
+        rewards = np.zeros((num_sequences, horizon))
+        observations = []
+        for k in range(num_sequences):
+            self.restore(snapshot)
+            for h in range(horizon):
+                for _ in range(self.frame_skip):
+                    reward, _ = self._step_physics(actions[k, h])
+                    if self.non_newtonian:
+                        self.env.physics.data.qvel[:] = 0
+                    rewards[k, h] += reward or 0
+                if return_obs:
+                    self.invalidate_render_cache()
+                    observations.append(self._observe())
+        self.restore(snapshot)
+
+        if not return_obs:
+            return rewards
+
+        if isinstance(observations[0], dict):
+            observations = OrderedDict(
+                (key, np.stack([obs[key] for obs in observations]).reshape(num_sequences, horizon, *value.shape))
+                for key, value in observations[0].items()
+            )
+        else:
+            observations = np.stack(observations).reshape(num_sequences, horizon, *observations[0].shape)
+        return rewards, observations
+
+    def _step_physics(self, action):
+        """Advance the dm_control environment by one control step without computing the observation.
+
+        Mirrors `dm_control.rl.control.Environment.step`, so that the frame_skip
+        loop does not build a `TimeStep` for the frames it throws away.
+
+        Returns:
+            (reward, done)
+        """
+        env, physics, task = self.env, self.env.physics, self.env.task
+
+        task.before_step(action, physics)
+        physics.step(env._n_sub_steps)
+        task.after_step(physics)
+        reward = task.get_reward(physics)
+
+        env._step_count += 1
+        discount = 1.0 if env._step_count >= env._step_limit else task.get_termination(physics)
+        done = discount is not None
+        if done:
+            env._reset_next_step = True
+        return reward, done
 
     def step(self, action):
-        reward = 0
+        self._expire_info()
+        self.invalidate_render_cache()
+        reward, done = 0, False
 
         for i in range(self.frame_skip):
-            ts = self.env.step(action)
+            if self.env._reset_next_step:  # same as dm_control, stepping a finished episode starts a new one.
+                self._reset_physics()
+                continue
+            substep_reward, done = self._step_physics(action)
             if self.non_newtonian:  # zero velocity if non newtonian
                 self.env.physics.data.qvel[:] = 0
-            reward += ts.reward or 0
-            done = ts.last()
+            reward += substep_reward or 0
             if done:
                 break
 
-        sim_state = self.env.physics.get_state().copy()
+        return self._observe(), reward, done, self._make_info()
+
+    def _get_obs(self):
+        obs = self.env.task.get_observation(self.env.physics)
+        if self.env._flat_observation:
+            obs = control.flatten_observation(obs)
+        return obs
+
+    def _observe(self):
+        """Compute the observation entries selected by `obs_keys`."""
+        if not self._state_keys:
+            obs = OrderedDict()
+        elif self._select_state_keys:
+            full_obs = self._get_obs()
+            obs = OrderedDict((key, full_obs[key]) for key in self._state_keys)
+        else:
+            obs = self._get_obs()
 
-        obs = ts.observation
         if self.from_pixels:
             obs["pixels"] = self._get_obs_pixels()
+        return obs
 
-        return obs, reward, done, dict(sim_state=sim_state)
+    def _reset_physics(self):
+        """Start a new episode of the dm_control environment without computing the observation.
 
-    def _get_obs(self):
-        return self.env.task.get_observation(self.env.physics)
+        Mirrors `dm_control.rl.control.Environment.reset`.
+        """
+        env = self.env
+        env._reset_next_step = False
+        env._step_count = 0
+        self._episode_state = None
+        with env.physics.reset_context():
+            env.task.initialize_episode(env.physics)
+
+    def _view_space(self, modality):
+        if modality == "rgb":
+            return spaces.Box(low=0, high=255, shape=self.pixel_pipeline.shape, dtype=np.uint8)
+        shape = self.pixel_pipeline.shape[1:] if self.channels_first else self.pixel_pipeline.shape[:2]
+        channels = 1 if modality == "depth" else 2
+        shape = (channels, *shape) if self.channels_first else (*shape, channels)
+        if modality == "depth":
+            return spaces.Box(low=0, high=np.inf, shape=shape, dtype=np.float32)
+        return spaces.Box(low=-1, high=np.iinfo(np.int32).max, shape=shape, dtype=np.int32)
+
+    def _process_view(self, modality, img):
+        """Bring a depth or segmentation image into the layout of the rgb observation."""
+        if modality == "rgb":
+            return self.pixel_pipeline(img)
+        img = self.pixel_pipeline.crop_resize(img)
+        if modality == "depth":
+            img = img[..., None]
+        return np.ascontiguousarray(img.transpose(2, 0, 1)) if self.channels_first else img.copy()
 
     def _get_obs_pixels(self):
-        img = self.render("gray" if self.gray_scale else "rgb", **self.render_kwargs)
-        return img.transpose([2, 0, 1]) if self.channels_first else img
+        if not self.multi_view:
+            return self.pixel_pipeline(self._render_physics(**self.render_kwargs))
 
-    def reset(self):
-        obs = self.env.reset().observation
-        for i in range(self.skip_start or 0):
-            obs = self.env.step([0]).observation
+        if self._multi_view_renderer is None:
+            from .multiview import MultiViewRenderer
 
-        if self.from_pixels:
-            obs["pixels"] = self._get_obs_pixels()
+            height, width = self.render_kwargs["height"], self.render_kwargs["width"]
+            self._multi_view_renderer = MultiViewRenderer(self.env.physics, self.cameras, height, width, self.modalities)
 
+        obs = OrderedDict()
+        for (camera, modality), img in self._multi_view_renderer.render().items():
+            # share the frames with `render`, through its cache.
+            key = (camera, self.render_kwargs["height"], self.render_kwargs["width"], modality == "depth", modality == "segmentation")
+            img.flags.writeable = False
+            self._render_cache[key] = img
+            obs[f"{modality}_{camera}"] = self._process_view(modality, img)
         return obs
 
+    def invalidate_render_cache(self):
+        """Drop the cached frames. `step`, `reset` and `set_state` call this, call it
+        yourself after changing the physics by hand."""
+        self._render_cache.clear()
+
+    def _render_physics(self, height, width, camera_id, **kwargs):
+        """`physics.render` with a cache for frames of the current physics state.
+
+        Calls with other arguments than `depth` and `segmentation` (e.g. a
+        `scene_option`) are not cached. The cached frames are read-only.
+        """
+        if not kwargs.keys() <= {"depth", "segmentation"}:
+            return self.env.physics.render(height=height, width=width, camera_id=camera_id, **kwargs)
+
+        key = (camera_id, height, width, bool(kwargs.get("depth")), bool(kwargs.get("segmentation")))
+        img = self._render_cache.get(key)
+        if img is None:
+            img = self._render_cache[key] = self.env.physics.render(height=height, width=width, camera_id=camera_id, **kwargs)
+            img.flags.writeable = False
+        return img
+
+    def reset(self):
+        self._expire_info()
+        self.invalidate_render_cache()
+        self._reset_physics()
+        for i in range(self.skip_start or 0):
+            self._step_physics([0])
+        return self._observe()
+
     def render(self, mode="human", height=None, width=None, camera_id=0, **kwargs) -> NDArray:
         if kwargs.get("depth", None):
             print("is depth")
@@ -169,7 +519,7 @@ class DMCEnv(Env):
         if mode == "depth":
             kwargs["depth"] = True
 
-        img = self.env.physics.render(
+        img = self._render_physics(
             width=self.render_kwargs["width"] if width is None else width,
             height=self.render_kwargs["height"] if height is None else height,
             camera_id=self.render_kwargs["camera_id"] if camera_id is None else camera_id,
@@ -178,9 +528,9 @@ class DMCEnv(Env):
         if mode in ["rgb", "rgb_array", "human"]:
             return img.astype(np.uint8)
         elif mode == "depth":
-            return img
+            return img.copy()
         elif mode in ["gray", "grey"]:
-            return img.mean(axis=-1, keepdims=True).astype(np.uint8)
+            return to_gray(img)[..., None]
         elif mode == "notebook":
             from IPython.display import display
             from PIL import Image
@@ -192,7 +542,20 @@ class DMCEnv(Env):
             raise NotImplementedError(f"`{mode}` mode is not implemented")
 
     def close(self):
+        # the GL contexts are bound to the thread of `step_async`, if the env was stepped with it.
+        self._close_async_executor(self._free_resources)
+        return self.env.close()
+
+    def _free_resources(self):
+        if self._multi_view_renderer is not None:
+            self._multi_view_renderer.free()
+            self._multi_view_renderer = None
         if self.viewer is not None:
             self.viewer.close()
             self.viewer = None
-        return self.env.close()
+        # free the GL context of `physics.render` on the calling thread, instead of at exit on the main thread,
+        # which fails for a context that is current on another thread.
+        physics = self.env.physics
+        with physics._contexts_lock:
+            if physics._contexts:
+                physics._free_rendering_contexts()
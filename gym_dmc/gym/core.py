@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import TypeVar, Generic, Tuple, Union, Optional, SupportsFloat
 
 from . import spaces
@@ -46,6 +49,8 @@ class Env(Generic[ObsType, ActType]):
 
     # Created
     _np_random: RandomNumberGenerator | None = None
+    # the thread of `step_async` and `reset_async`, created on first use.
+    _async_executor: ThreadPoolExecutor | None = None
 
     @property
     def np_random(self) -> RandomNumberGenerator:
@@ -144,13 +149,56 @@ class Env(Generic[ObsType, ActType]):
         """
         raise NotImplementedError
 
+    async def step_async(self, action: ActType) -> Tuple[ObsType, float, bool, dict]:
+        """Awaitable version of `step`, for actor loops that run on asyncio.
+
+        The default implementation runs the blocking `step` on a thread of the
+        environment, so the loop keeps serving other tasks (policy inference,
+        logging) in the meantime. Because it calls `self.step`, every wrapper
+        in the stack still applies. Subclasses that can wait without holding a
+        thread should override it.
+
+        The thread belongs to the unwrapped environment and runs all of its
+        async calls, as a GL context can only be used on the thread that made
+        it current. `close` stops it.
+
+        Do not await two calls on the same environment at the same time.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_async_executor(), self.step, action)
+
+    async def reset_async(self, **kwargs) -> Union[ObsType, tuple[ObsType, dict]]:
+        """Awaitable version of `reset`, see `step_async`."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_async_executor(), partial(self.reset, **kwargs))
+
+    def _get_async_executor(self) -> ThreadPoolExecutor:
+        env = self.unwrapped
+        if env._async_executor is None:
+            env._async_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gym_dmc_async")
+        return env._async_executor
+
+    def _close_async_executor(self, cleanup=None):
+        """Stop the thread of `step_async`. `cleanup` runs on that thread first, if there is one, so it can
+        free the resources that are bound to it."""
+        executor, self._async_executor = self._async_executor, None
+        if executor is None:
+            if cleanup is not None:
+                cleanup()
+            return
+        try:
+            if cleanup is not None:
+                executor.submit(cleanup).result()
+        finally:
+            executor.shutdown(wait=True)
+
     def close(self):
         """Override close in your subclass to perform any necessary cleanup.
 
         Environments will automatically close() themselves when
         garbage collected or when the program exits.
         """
-        pass
+        self._close_async_executor()
 
     def seed(self, seed=None):
         """Sets the seed for this env's random number generator(s).
@@ -10,6 +10,8 @@ from .utils import flatdim
 from .utils import flatten_space
 from .utils import flatten
 from .utils import unflatten
+from .utils import batch_flatten
+from .utils import batch_unflatten
 
 __all__ = [
     "Space",
@@ -23,4 +25,6 @@ __all__ = [
     "flatten_space",
     "flatten",
     "unflatten",
+    "batch_flatten",
+    "batch_unflatten",
 ]
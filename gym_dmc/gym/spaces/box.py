@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Tuple, SupportsFloat, Union, Type, Optional, Sequence
 
 import numpy as np
@@ -19,6 +20,38 @@ def _short_repr(arr: np.ndarray) -> str:
     return str(arr)
 
 
+def _read_only(value) -> np.ndarray:
+    """A read-only copy of a bound. `sample` caches its masks for the bounds, so they must not change in place."""
+    value = np.array(value)
+    value.flags.writeable = False
+    return value
+
+
+@lru_cache(maxsize=None)
+def _can_cast(from_dtype, to_dtype) -> bool:
+    return bool(np.can_cast(from_dtype, to_dtype))
+
+
+class _SamplePlan:
+    """The masks and bounds of each kind of interval that `Box.sample` needs, for the current bounds."""
+
+    def __init__(self, box: "Box"):
+        below, above = box.bounded_below, box.bounded_above
+        high = box.high if box.dtype.kind == "f" else box.high.astype("int64") + 1
+
+        self.bounded = below & above
+        self.all_bounded = bool(self.bounded.all())
+        self.bounded_low = box.low if self.all_bounded else box.low[self.bounded]
+        self.bounded_high = high if self.all_bounded else high[self.bounded]
+
+        self.unbounded = ~below & ~above
+        self.upp_bounded = ~below & above
+        self.low_bounded = below & ~above
+        self.n_unbounded = int(self.unbounded.sum())
+        self.low_bounded_low = box.low[self.low_bounded]
+        self.upp_bounded_high = box.high[self.upp_bounded]
+
+
 class Box(Space[np.ndarray]):
     """
     A (possibly unbounded) box in R^n. Specifically, a Box represents the
@@ -37,6 +70,9 @@ class Box(Space[np.ndarray]):
 
     """
 
+    # `sample` caches its masks for the bounds, so `low`, `high` and `bounded_below` / `bounded_above` are
+    # read-only. Assign new arrays to change them.
+
     def __init__(
         self,
         low: Union[SupportsFloat, np.ndarray],
@@ -95,6 +131,42 @@ class Box(Space[np.ndarray]):
         """Has stricter type than gym.Space - never None."""
         return self._shape
 
+    @property
+    def low(self) -> np.ndarray:
+        return self._low
+
+    @low.setter
+    def low(self, value: np.ndarray):
+        self._low = _read_only(value)
+        self._sample_plan = None
+
+    @property
+    def high(self) -> np.ndarray:
+        return self._high
+
+    @high.setter
+    def high(self, value: np.ndarray):
+        self._high = _read_only(value)
+        self._sample_plan = None
+
+    @property
+    def bounded_below(self) -> np.ndarray:
+        return self._bounded_below
+
+    @bounded_below.setter
+    def bounded_below(self, value: np.ndarray):
+        self._bounded_below = _read_only(value)
+        self._sample_plan = None
+
+    @property
+    def bounded_above(self) -> np.ndarray:
+        return self._bounded_above
+
+    @bounded_above.setter
+    def bounded_above(self, value: np.ndarray):
+        self._bounded_above = _read_only(value)
+        self._sample_plan = None
+
     def is_bounded(self, manner: str = "both") -> bool:
         below = bool(np.all(self.bounded_below))
         above = bool(np.all(self.bounded_above))
@@ -107,9 +179,10 @@ class Box(Space[np.ndarray]):
         else:
             raise ValueError("manner is not in {'below', 'above', 'both'}")
 
-    def sample(self) -> np.ndarray:
+    def sample(self, n: Optional[int] = None) -> np.ndarray:
         """
-        Generates a single random sample inside of the Box.
+        Generates a single random sample inside of the Box, or `n` of them
+        with shape `(n, *shape)`.
 
         In creating a sample of the box, each coordinate is sampled according to
         the form of the interval:
@@ -119,44 +192,47 @@ class Box(Space[np.ndarray]):
         * (-oo, b] : shifted negative exponential distribution
         * (-oo, oo) : normal distribution
         """
-        high = self.high if self.dtype.kind == "f" else self.high.astype("int64") + 1
-        sample = np.empty(self.shape)
-
-        # Masking arrays which classify the coordinates according to interval
-        # type
-        unbounded = ~self.bounded_below & ~self.bounded_above
-        upp_bounded = ~self.bounded_below & self.bounded_above
-        low_bounded = self.bounded_below & ~self.bounded_above
-        bounded = self.bounded_below & self.bounded_above
-
-        # Vectorized sampling by interval type
-        sample[unbounded] = self.np_random.normal(size=unbounded[unbounded].shape)
-
-        sample[low_bounded] = (
-            self.np_random.exponential(size=low_bounded[low_bounded].shape)
-            + self.low[low_bounded]
-        )
+        plan = self._sample_plan
+        if plan is None:
+            plan = self._sample_plan = _SamplePlan(self)
+        batch = () if n is None else (n,)
+
+        if plan.all_bounded:
+            # the common case of action spaces, which skips the masks. It draws the same numbers.
+            sample = self.np_random.uniform(
+                low=plan.bounded_low, high=plan.bounded_high, size=batch + self.shape
+            )
+        else:
+            sample = np.empty(batch + self.shape)
 
-        sample[upp_bounded] = (
-            -self.np_random.exponential(size=upp_bounded[upp_bounded].shape)
-            + self.high[upp_bounded]
-        )
+            # Vectorized sampling by interval type
+            sample[..., plan.unbounded] = self.np_random.normal(size=batch + (plan.n_unbounded,))
 
-        sample[bounded] = self.np_random.uniform(
-            low=self.low[bounded], high=high[bounded], size=bounded[bounded].shape
-        )
+            sample[..., plan.low_bounded] = (
+                self.np_random.exponential(size=batch + plan.low_bounded_low.shape)
+                + plan.low_bounded_low
+            )
+
+            sample[..., plan.upp_bounded] = (
+                -self.np_random.exponential(size=batch + plan.upp_bounded_high.shape)
+                + plan.upp_bounded_high
+            )
+
+            sample[..., plan.bounded] = self.np_random.uniform(
+                low=plan.bounded_low, high=plan.bounded_high, size=batch + plan.bounded_low.shape
+            )
         if self.dtype.kind == "i":
-            sample = np.floor(sample)
+            sample = np.floor(sample, out=sample)
 
         return sample.astype(self.dtype)
 
     def contains(self, x) -> bool:
         if not isinstance(x, np.ndarray):
-            logger.warn("Casting input x to numpy array.")
+            warnings.warn("Casting input x to numpy array.")
             x = np.asarray(x, dtype=self.dtype)
 
         return bool(
-            np.can_cast(x.dtype, self.dtype)
+            _can_cast(x.dtype, self.dtype)
             and x.shape == self.shape
             and np.all(x >= self.low)
             and np.all(x <= self.high)
@@ -165,6 +241,22 @@ class Box(Space[np.ndarray]):
     def to_jsonable(self, sample_n):
         return np.array(sample_n).tolist()
 
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_sample_plan"] = None
+        return state
+
+    def __setstate__(self, state):
+        state = dict(state)
+        # pickled before the bounds became properties.
+        for name in ("low", "high", "bounded_below", "bounded_above"):
+            if name in state:
+                state["_" + name] = state.pop(name)
+            if "_" + name in state:
+                state["_" + name] = _read_only(state["_" + name])
+        state["_sample_plan"] = None
+        super().__setstate__(state)
+
     def from_jsonable(self, sample_n: Sequence[SupportsFloat]) -> list[np.ndarray]:
         return [np.asarray(sample) for sample in sample_n]
 
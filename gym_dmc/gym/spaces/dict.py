@@ -105,8 +105,8 @@ class Dict(Space[TypingDict[str, Space]], Mapping):
 
         return seeds
 
-    def sample(self) -> dict:
-        return OrderedDict([(k, space.sample()) for k, space in self.spaces.items()])
+    def sample(self, n: int | None = None) -> dict:
+        return OrderedDict([(k, space.sample(n)) for k, space in self.spaces.items()])
 
     def contains(self, x) -> bool:
         if not isinstance(x, dict) or len(x) != len(self.spaces):
@@ -24,7 +24,9 @@ class Discrete(Space[int]):
         self.start = int(start)
         super().__init__((), np.int64, seed)
 
-    def sample(self) -> int:
+    def sample(self, n: Optional[int] = None) -> int:
+        if n is not None:
+            return self.start + self.np_random.integers(self.n, size=n, dtype=self.dtype)
         return int(self.start + self.np_random.integers(self.n))
 
     def contains(self, x) -> bool:
@@ -47,8 +47,9 @@ class MultiBinary(Space[np.ndarray]):
         """Has stricter type than gym.Space - never None."""
         return self._shape  # type: ignore
 
-    def sample(self) -> np.ndarray:
-        return self.np_random.integers(low=0, high=2, size=self.n, dtype=self.dtype)
+    def sample(self, n: Optional[int] = None) -> np.ndarray:
+        size = self.n if n is None else (n,) + self.shape
+        return self.np_random.integers(low=0, high=2, size=size, dtype=self.dtype)
 
     def contains(self, x) -> bool:
         if isinstance(x, Sequence):
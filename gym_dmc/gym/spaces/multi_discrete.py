@@ -41,8 +41,9 @@ class MultiDiscrete(Space[np.ndarray]):
         """Has stricter type than gym.Space - never None."""
         return self._shape  # type: ignore
 
-    def sample(self) -> np.ndarray:
-        return (self.np_random.random(self.nvec.shape) * self.nvec).astype(self.dtype)
+    def sample(self, n: int | None = None) -> np.ndarray:
+        size = self.nvec.shape if n is None else (n,) + self.nvec.shape
+        return (self.np_random.random(size) * self.nvec).astype(self.dtype)
 
     def contains(self, x) -> bool:
         if isinstance(x, Sequence):
@@ -59,9 +59,13 @@ class Space(Generic[T_cov]):
         """Return the shape of the space as an immutable property"""
         return self._shape
 
-    def sample(self) -> T_cov:
+    def sample(self, n: Optional[int] = None) -> T_cov:
         """Randomly sample an element of this space. Can be
-        uniform or non-uniform sampling based on boundedness of space."""
+        uniform or non-uniform sampling based on boundedness of space.
+
+        With `n`, returns `n` samples in one vectorized call, batched along a
+        leading dimension the way `gym.vector.utils.batch_space` does: arrays
+        of shape `(n, *shape)`, and tuples / dicts of batched samples."""
         raise NotImplementedError
 
     def seed(self, seed: Optional[int] = None) -> list:
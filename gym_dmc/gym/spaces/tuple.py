@@ -54,8 +54,8 @@ class Tuple(Space[tuple], Sequence):
 
         return seeds
 
-    def sample(self) -> tuple:
-        return tuple(space.sample() for space in self.spaces)
+    def sample(self, n: Optional[int] = None) -> tuple:
+        return tuple(space.sample(n) for space in self.spaces)
 
     def contains(self, x) -> bool:
         if isinstance(x, (list, np.ndarray)):
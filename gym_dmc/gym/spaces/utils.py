@@ -42,14 +42,26 @@ def _flatdim_multidiscrete(space: MultiDiscrete) -> int:
     return int(np.sum(space.nvec))
 
 
-@flatdim.register(Tuple)
-def _flatdim_tuple(space: Tuple) -> int:
-    return sum(flatdim(s) for s in space.spaces)
+def _flat_slices(space: Union[Tuple, Dict]) -> tuple[list[slice], int]:
+    """The `slice` of each subspace of a Tuple or Dict in the flattened point, and its `flatdim`. It is
+    cached on the space for its current subspaces, replacing one of them recomputes it."""
+    subspaces = tuple(space.spaces.values()) if isinstance(space, Dict) else tuple(space.spaces)
+    cached = space.__dict__.get("_flat_slices")
+    if cached is not None and len(cached[0]) == len(subspaces) and all(map(op.is_, cached[0], subspaces)):
+        return cached[1]
+    slices, start = [], 0
+    for s in subspaces:
+        stop = start + flatdim(s)
+        slices.append(slice(start, stop))
+        start = stop
+    space._flat_slices = subspaces, (slices, start)
+    return slices, start
 
 
+@flatdim.register(Tuple)
 @flatdim.register(Dict)
-def _flatdim_dict(space: Dict) -> int:
-    return sum(flatdim(s) for s in space.spaces.values())
+def _flatdim_tuple_dict(space: Union[Tuple, Dict]) -> int:
+    return _flat_slices(space)[1]
 
 
 T = TypeVar("T")
@@ -82,13 +94,24 @@ def _flatten_discrete(space, x) -> np.ndarray:
     return onehot
 
 
-@flatten.register(MultiDiscrete)
-def _flatten_multidiscrete(space, x) -> np.ndarray:
+def _multidiscrete_offsets(space: MultiDiscrete) -> np.ndarray:
+    """The start of each one-hot block in the flattened point, and the size at the end. It is cached on
+    the space for its `nvec` array, a new `nvec` recomputes it."""
+    cached = space.__dict__.get("_flat_offsets")
+    if cached is not None and cached[0] is space.nvec:
+        return cached[1]
     offsets = np.zeros((space.nvec.size + 1,), dtype=space.dtype)
     offsets[1:] = np.cumsum(space.nvec.flatten())
+    space._flat_offsets = space.nvec, offsets
+    return offsets
+
+
+@flatten.register(MultiDiscrete)
+def _flatten_multidiscrete(space, x) -> np.ndarray:
+    offsets = _multidiscrete_offsets(space)
 
     onehot = np.zeros((offsets[-1],), dtype=space.dtype)
-    onehot[offsets[:-1] + x.flatten()] = 1
+    onehot[offsets[:-1] + np.ravel(x)] = 1
     return onehot
 
 
@@ -129,30 +152,135 @@ def _unflatten_discrete(space: Discrete, x: np.ndarray) -> int:
 
 @unflatten.register(MultiDiscrete)
 def _unflatten_multidiscrete(space: MultiDiscrete, x: np.ndarray) -> np.ndarray:
-    offsets = np.zeros((space.nvec.size + 1,), dtype=space.dtype)
-    offsets[1:] = np.cumsum(space.nvec.flatten())
+    offsets = _multidiscrete_offsets(space)
 
     (indices,) = np.nonzero(x)
     return np.asarray(indices - offsets[:-1], dtype=space.dtype).reshape(space.shape)
 
 
+def _split(space: Union[Tuple, Dict], x: np.ndarray) -> list:
+    """The views of `x` that hold the flattened points of the subspaces, in order, along its last axis."""
+    return [x[..., columns] for columns in _flat_slices(space)[0]]
+
+
 @unflatten.register(Tuple)
 def _unflatten_tuple(space: Tuple, x: np.ndarray) -> tuple:
-    dims = np.asarray([flatdim(s) for s in space.spaces], dtype=np.int_)
-    list_flattened = np.split(x, np.cumsum(dims[:-1]))
     return tuple(
-        unflatten(s, flattened) for flattened, s in zip(list_flattened, space.spaces)
+        unflatten(s, flattened) for flattened, s in zip(_split(space, x), space.spaces)
     )
 
 
 @unflatten.register(Dict)
 def _unflatten_dict(space: Dict, x: np.ndarray) -> dict:
-    dims = np.asarray([flatdim(s) for s in space.spaces.values()], dtype=np.int_)
-    list_flattened = np.split(x, np.cumsum(dims[:-1]))
     return OrderedDict(
         [
             (key, unflatten(s, flattened))
-            for flattened, (key, s) in zip(list_flattened, space.spaces.items())
+            for flattened, (key, s) in zip(_split(space, x), space.spaces.items())
+        ]
+    )
+
+
+@singledispatch
+def batch_flatten(space: Space[T], x) -> np.ndarray:
+    """Flatten a batch of data points from a space.
+
+    This is ``flatten()`` over a leading batch dimension, in one vectorized
+    call: ``batch_flatten(space, x)[i]`` equals ``flatten(space, x_i)``. The
+    batch has the layout of ``space.sample(n)``, i.e. arrays of shape
+    ``(n, *shape)``, and tuples or dicts of such batches for ``Tuple`` and
+    ``Dict``.
+
+    Always returns a 2D array of shape ``(n, flatdim(space))``. Raises
+    ``NotImplementedError`` if the space is not defined in ``gym.spaces``.
+    """
+    raise NotImplementedError(f"Unknown space: `{space}`")
+
+
+@batch_flatten.register(Box)
+@batch_flatten.register(MultiBinary)
+def _batch_flatten_box_multibinary(space, x) -> np.ndarray:
+    x = np.asarray(x, dtype=space.dtype)
+    return x.reshape(len(x), flatdim(space)).copy()
+
+
+@batch_flatten.register(Discrete)
+def _batch_flatten_discrete(space, x) -> np.ndarray:
+    x = np.asarray(x)
+    onehot = np.zeros((len(x), space.n), dtype=space.dtype)
+    onehot[np.arange(len(x)), x - space.start] = 1
+    return onehot
+
+
+@batch_flatten.register(MultiDiscrete)
+def _batch_flatten_multidiscrete(space, x) -> np.ndarray:
+    offsets = _multidiscrete_offsets(space)
+    x = np.asarray(x)
+
+    onehot = np.zeros((len(x), offsets[-1]), dtype=space.dtype)
+    onehot[np.arange(len(x))[:, None], offsets[:-1] + x.reshape(len(x), -1)] = 1
+    return onehot
+
+
+@batch_flatten.register(Tuple)
+def _batch_flatten_tuple(space, x) -> np.ndarray:
+    return np.concatenate(
+        [batch_flatten(s, x_part) for x_part, s in zip(x, space.spaces)], axis=1
+    )
+
+
+@batch_flatten.register(Dict)
+def _batch_flatten_dict(space, x) -> np.ndarray:
+    return np.concatenate(
+        [batch_flatten(s, x[key]) for key, s in space.spaces.items()], axis=1
+    )
+
+
+@singledispatch
+def batch_unflatten(space: Space[T], x: np.ndarray):
+    """Unflatten a batch of data points from a space.
+
+    This reverses ``batch_flatten()``: ``x`` has shape ``(n, flatdim(space))``
+    and the result has the layout of ``space.sample(n)``. Discrete points come
+    back as an integer array of shape ``(n,)``. Raises
+    ``NotImplementedError`` if the space is not defined in ``gym.spaces``.
+    """
+    raise NotImplementedError(f"Unknown space: `{space}`")
+
+
+@batch_unflatten.register(Box)
+@batch_unflatten.register(MultiBinary)
+def _batch_unflatten_box_multibinary(space: Box | MultiBinary, x: np.ndarray) -> np.ndarray:
+    return np.asarray(x, dtype=space.dtype).reshape((len(x),) + space.shape)
+
+
+@batch_unflatten.register(Discrete)
+def _batch_unflatten_discrete(space: Discrete, x: np.ndarray) -> np.ndarray:
+    return space.start + np.argmax(x, axis=1).astype(space.dtype)
+
+
+@batch_unflatten.register(MultiDiscrete)
+def _batch_unflatten_multidiscrete(space: MultiDiscrete, x: np.ndarray) -> np.ndarray:
+    offsets = _multidiscrete_offsets(space)
+
+    # each row holds exactly one 1 per block, and `nonzero` returns them in order.
+    _, indices = np.nonzero(x)
+    indices = indices.reshape(len(x), -1) - offsets[:-1]
+    return np.asarray(indices, dtype=space.dtype).reshape((len(x),) + space.shape)
+
+
+@batch_unflatten.register(Tuple)
+def _batch_unflatten_tuple(space: Tuple, x: np.ndarray) -> tuple:
+    return tuple(
+        batch_unflatten(s, flattened) for flattened, s in zip(_split(space, x), space.spaces)
+    )
+
+
+@batch_unflatten.register(Dict)
+def _batch_unflatten_dict(space: Dict, x: np.ndarray) -> dict:
+    return OrderedDict(
+        [
+            (key, batch_unflatten(s, flattened))
+            for flattened, (key, s) in zip(_split(space, x), space.spaces.items())
         ]
     )
 
@@ -0,0 +1,177 @@
+"""Caches for the compiled MuJoCo models of the suite tasks.
+
+Every suite task builds its physics through `Physics.from_xml_string(xml_string, assets)` of its domain
+module. `load` runs the task code of the suite in a private copy of the module namespace, where `Physics`
+builds the physics from a cached model instead. Nothing in dm_control is modified, so other code that
+builds physics at the same time is not affected. The cache is keyed on the content of the xml and the
+assets, which covers the task kwargs that change the model (e.g. the number of poles in cartpole),
+together with the MuJoCo version.
+
+Usage::
+
+    env = gym_dmc.make("dmc:Dog-run-v1", model_cache="~/.cache/gym_dmc")
+    # or, for every env in the process: export GYM_DMC_MODEL_CACHE=~/.cache/gym_dmc
+
+    # all envs of the task share one MjModel, and each only allocates its own MjData
+    envs = [gym_dmc.make("dmc:Walker-walk-v1", share_model=True) for _ in range(64)]
+"""
+
+import hashlib
+import importlib
+import os
+import threading
+import types
+import weakref
+from functools import partial
+
+# guards the models of `shared_models`, so that concurrent loads of a task compile it once.
+_lock = threading.RLock()
+
+# these domains generate a random model xml for every env, so a cache would only grow. They are built
+# without the cache and do not support `share_model`.
+RANDOM_MODEL = ("lqr",)
+
+# these domains randomize the model itself in `initialize_episode`, e.g. the target position of the
+# reacher. Envs sharing the model would see each other's episodes, so they do not support `share_model`.
+# The fields are part of a `DMCEnv.snapshot`.
+MUTATES_MODEL = {
+    "finger": ("site_pos", "site_size"),
+    "fish": ("geom_pos",),
+    "manipulator": ("body_pos", "body_quat"),
+    "point_mass": ("wrap_prm",),
+    "quadruped": ("hfield_data",),
+    "reacher": ("geom_pos", "geom_size"),
+    "stacker": ("body_pos",),
+    "swimmer": ("geom_pos", "light_pos"),
+}
+
+
+def _as_bytes(contents):
+    return contents.encode() if isinstance(contents, str) else bytes(contents)
+
+
+def model_key(xml_string, assets=None):
+    """Hash of everything the compiled model depends on."""
+    import mujoco
+
+    digest = hashlib.sha256(mujoco.__version__.encode())
+    digest.update(_as_bytes(xml_string))
+    for name in sorted(assets or {}):
+        digest.update(name.encode())
+        digest.update(_as_bytes(assets[name]))
+    return digest.hexdigest()
+
+
+class _PhysicsFactory:
+    """Stands in for the `Physics` class of a suite module, and builds it from `compile_model`."""
+
+    def __init__(self, physics_cls, compile_model):
+        self.physics_cls = physics_cls
+        self.compile_model = compile_model
+
+    def from_xml_string(self, xml_string, assets=None):
+        return self.physics_cls.from_model(self.compile_model(xml_string, assets))
+
+    def __getattr__(self, name):
+        return getattr(self.physics_cls, name)
+
+
+def task_builder(domain, task_name, compile_model):
+    """The suite function of the task, with its physics built from `compile_model(xml_string, assets)`.
+
+    The functions of the domain module are copied into a namespace of their own, so that the task
+    function and the helpers that it calls, e.g. `_make_swimmer`, all see the factory as `Physics`.
+    """
+    module_globals = vars(domain)
+    namespace = dict(module_globals, Physics=_PhysicsFactory(domain.Physics, compile_model))
+    for name, value in module_globals.items():
+        if isinstance(value, types.FunctionType) and value.__globals__ is module_globals:
+            fn = types.FunctionType(value.__code__, namespace, value.__name__, value.__defaults__, value.__closure__)
+            fn.__kwdefaults__ = value.__kwdefaults__
+            namespace[name] = fn
+    return namespace[domain.SUITE[task_name].__name__]
+
+
+class DiskModelCache:
+    """Stores each compiled model as an MJB binary in `cache_dir`."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = os.path.expanduser(cache_dir)
+
+    def path(self, xml_string, assets=None):
+        return os.path.join(self.cache_dir, model_key(xml_string, assets) + ".mjb")
+
+    def __call__(self, xml_string, assets=None):
+        from dm_control.mujoco import wrapper
+
+        path = self.path(xml_string, assets)
+        if os.path.exists(path):
+            try:
+                return wrapper.MjModel.from_binary_path(path)
+            except ValueError:
+                pass  # truncated or from an incompatible build, compile and overwrite it below.
+
+        model = wrapper.MjModel.from_xml_string(xml_string, assets=assets)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # workers often start together, so write to a private file and rename it into place.
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        model.save_binary(tmp_path)
+        os.replace(tmp_path, path)
+        return model
+
+
+def _compile(xml_string, assets=None):
+    from dm_control.mujoco import wrapper
+
+    return wrapper.MjModel.from_xml_string(xml_string, assets=assets)
+
+
+class SharedModelCache:
+    """Hands out the same model for the same xml, for as long as an env still holds on to it."""
+
+    def __init__(self):
+        self.models = weakref.WeakValueDictionary()
+
+    def __call__(self, xml_string, assets=None, compile_model=_compile):
+        key = model_key(xml_string, assets)
+        with _lock:
+            model = self.models.get(key)
+            if model is None:
+                model = self.models[key] = compile_model(xml_string, assets)
+        return model
+
+
+shared_models = SharedModelCache()
+
+
+def load(domain_name, task_name, cache_dir=None, share_model=False, task_kwargs=None, environment_kwargs=None, visualize_reward=False):
+    """`suite.load`, reading the compiled model from `cache_dir` when given, and sharing it between
+    the envs of this process with `share_model`. The shared model must be treated as read-only.
+
+    The domains in `RANDOM_MODEL` ignore `cache_dir`."""
+    from dm_control import suite
+
+    if share_model and domain_name in MUTATES_MODEL:
+        raise ValueError(f"`share_model` is not supported for {domain_name}, which modifies its model on reset.")
+    if share_model and domain_name in RANDOM_MODEL:
+        raise ValueError(f"`share_model` is not supported for {domain_name}, which generates a random model.")
+    if domain_name in RANDOM_MODEL:
+        cache_dir = None
+
+    if cache_dir is None and not share_model:
+        return suite.load(domain_name, task_name, task_kwargs, environment_kwargs, visualize_reward)
+
+    compile_model = _compile if cache_dir is None else DiskModelCache(cache_dir)
+    if share_model:
+        compile_model = partial(shared_models, compile_model=compile_model)
+
+    # the same checks and arguments as `suite.build_environment`.
+    if (domain_name, task_name) not in suite.ALL_TASKS:
+        raise ValueError(f"Task {task_name!r} of domain {domain_name!r} does not exist.")
+    domain = importlib.import_module(f"dm_control.suite.{domain_name}")
+    task_kwargs = dict(task_kwargs or {})
+    if environment_kwargs is not None:
+        task_kwargs["environment_kwargs"] = environment_kwargs
+    env = task_builder(domain, task_name, compile_model)(**task_kwargs)
+    env.task.visualize_reward = visualize_reward
+    return env
@@ -0,0 +1,134 @@
+import numpy as np
+import mujoco
+from dm_control.mujoco import wrapper
+
+MODALITIES = ("rgb", "depth", "segmentation")
+
+
+class MultiViewRenderer:
+    """Renders several cameras and modalities of one physics in a single pass.
+
+    `physics.render` builds a new `Camera`, with its own `MjvScene`, for every
+    call and switches to the GL context each time. This renderer keeps one
+    scene for all views. It adds the geoms to it once per frame, and only
+    moves the camera and the lights that follow it for each further view. All
+    views render inside one GL context switch. RGB and depth come from the
+    same `mjr_render` call. Segmentation needs a second render with the
+    segmentation flags turned on.
+
+    Args:
+        physics: The `dm_control.mujoco.Physics` to render.
+        cameras: Camera ids or names.
+        height: Image height.
+        width: Image width.
+        modalities: Any of "rgb", "depth" and "segmentation".
+    """
+
+    def __init__(self, physics, cameras, height, width, modalities=("rgb",)):
+        for modality in modalities:
+            assert modality in MODALITIES, f"`{modality}` is not one of the supported modalities {MODALITIES}"
+        global_ = physics.model.vis.global_
+        assert width <= global_.offwidth and height <= global_.offheight, (
+            f"{height}x{width} is larger than the offscreen framebuffer {global_.offheight}x{global_.offwidth} of the model"
+        )
+        self.physics = physics
+        self.cameras = tuple(cameras)
+        self.modalities = tuple(modalities)
+
+        self._scene = wrapper.MjvScene(model=physics.model)
+        self._scene_option = wrapper.MjvOption()
+        self._perturb = wrapper.MjvPerturb()
+        self._perturb.active = 0
+        self._perturb.select = 0
+        self._render_cameras = [self._render_camera(camera_id) for camera_id in self.cameras]
+        self._rect = mujoco.MjrRect(0, 0, width, height)
+        self._rgb_buffers = [np.empty((height, width, 3), dtype=np.uint8) for _ in self.cameras]
+        self._depth_buffers = [np.empty((height, width), dtype=np.float32) for _ in self.cameras]
+        self._segmentation_buffers = [np.empty((height, width, 3), dtype=np.uint8) for _ in self.cameras]
+        # the segmentation ids depend on the geoms only, which all views share.
+        self._segment_ids = None
+
+        with physics.contexts.gl.make_current() as ctx:
+            ctx.call(mujoco.mjr_setBuffer, mujoco.mjtFramebuffer.mjFB_OFFSCREEN, physics.contexts.mujoco.ptr)
+
+    def _render_camera(self, camera_id):
+        """A fixed camera, or the free camera for -1, the same as `Camera` sets up."""
+        if isinstance(camera_id, str):
+            camera_id = self.physics.model.name2id(camera_id, "camera")
+        assert -1 <= camera_id < self.physics.model.ncam, f"model has {self.physics.model.ncam} fixed cameras, got {camera_id}"
+        camera = wrapper.MjvCamera()
+        camera.fixedcamid = camera_id
+        if camera_id == -1:
+            camera.type = mujoco.mjtCamera.mjCAMERA_FREE
+            mujoco.mjv_defaultFreeCamera(self.physics.model._model, camera)
+        else:
+            camera.type = mujoco.mjtCamera.mjCAMERA_FIXED
+        return camera
+
+    def render(self) -> dict:
+        """Returns a dict of `(camera, modality)` to image, with the same layout as `physics.render`."""
+        model, data = self.physics.model.ptr, self.physics.data.ptr
+        mujoco.mjv_updateScene(
+            model, data, self._scene_option.ptr, self._perturb.ptr, self._render_cameras[0].ptr, mujoco.mjtCatBit.mjCAT_ALL, self._scene.ptr
+        )
+        self._segment_ids = None
+
+        with self.physics.contexts.gl.make_current() as ctx:
+            ctx.call(self._render_on_gl_thread)
+
+        to_pixels = self.physics.contexts.gl.to_pixels
+        images = {}
+        for index, camera_id in enumerate(self.cameras):
+            if "rgb" in self.modalities:
+                images[camera_id, "rgb"] = to_pixels(self._rgb_buffers[index]).copy()
+            if "depth" in self.modalities:
+                images[camera_id, "depth"] = to_pixels(self._linear_depth(self._depth_buffers[index]))
+            if "segmentation" in self.modalities:
+                images[camera_id, "segmentation"] = to_pixels(self._segmentation(self._segmentation_buffers[index]))
+        return images
+
+    def _render_on_gl_thread(self):
+        model, data = self.physics.model.ptr, self.physics.data.ptr
+        context = self.physics.contexts.mujoco.ptr
+        rgb, depth = "rgb" in self.modalities, "depth" in self.modalities
+        for index, camera in enumerate(self._render_cameras):
+            if index:
+                # the geoms are the same for every view, only the camera and the headlight move.
+                mujoco.mjv_updateCamera(model, data, camera.ptr, self._scene.ptr)
+                mujoco.mjv_makeLights(model, data, self._scene.ptr)
+            if rgb or depth:
+                mujoco.mjr_render(self._rect, self._scene.ptr, context)
+                rgb_buffer = self._rgb_buffers[index] if rgb else None
+                depth_buffer = self._depth_buffers[index] if depth else None
+                mujoco.mjr_readPixels(rgb_buffer, depth_buffer, self._rect, context)
+            if "segmentation" in self.modalities:
+                flags = {mujoco.mjtRndFlag.mjRND_SEGMENT: True, mujoco.mjtRndFlag.mjRND_IDCOLOR: True}
+                with self._scene.override_flags(flags):
+                    mujoco.mjr_render(self._rect, self._scene.ptr, context)
+                    mujoco.mjr_readPixels(self._segmentation_buffers[index], None, self._rect, context)
+
+    def _linear_depth(self, depth_buffer):
+        # same conversion as `Camera.render(depth=True)`, from [0 1] to meters.
+        extent = self.physics.model.stat.extent
+        near = self.physics.model.vis.map.znear * extent
+        far = self.physics.model.vis.map.zfar * extent
+        return near / (1 - depth_buffer * (1 - near / far))
+
+    def _segmentation(self, buffer):
+        # same conversion as `Camera.render(segmentation=True)`, to (object id, object type) pairs.
+        if self._segment_ids is None:
+            scene = self._scene
+            segid2output = np.full((scene.ngeom + 1, 2), fill_value=-1, dtype=np.int32)
+            visible_geoms = [g for g in scene.geoms if g.segid != -1]
+            visible_segids = np.array([g.segid + 1 for g in visible_geoms], np.int32)
+            segid2output[visible_segids, 0] = np.array([g.objid for g in visible_geoms], np.int32)
+            segid2output[visible_segids, 1] = np.array([g.objtype for g in visible_geoms], np.int32)
+            self._segment_ids = segid2output
+        image3 = buffer.astype(np.uint32)
+        segimage = image3[:, :, 0] + image3[:, :, 1] * (2**8) + image3[:, :, 2] * (2**16)
+        return self._segment_ids[segimage]
+
+    def free(self):
+        if self._scene is not None:
+            self._scene.free()
+            self._scene = None
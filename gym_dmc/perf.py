@@ -0,0 +1,137 @@
+"""Opt-in timing of the phases of a step.
+
+`enable_perf_stats` replaces the timed methods of the env and of its wrappers with timed versions on the
+instances, so nothing is measured, and nothing is added to the step, until it is called.
+
+Usage::
+
+    env = gym_dmc.make("dmc:Walker-walk-v1", from_pixels=True, perf_stats=True)
+    # or, for wrappers added later: gym_dmc.perf.enable_perf_stats(TimeLimit(env, 250))
+    ...
+    env.perf_stats()
+    # {"physics": {"calls": 1000, "total": 0.21, "mean": 0.00021}, "render": {...}, "wrapper.TimeLimit": {...}, ...}
+
+The phases are
+
+- `physics`: the physics substeps, `physics.step`
+- `observation`: the state observation of the task
+- `render`: rendering the frame for the pixel observation, and `env.render`
+- `pixels`: the grayscale / channel-first pixel pipeline
+- `flatten`: `FlattenObservation`
+- `step.<Env>`: the whole `step` of each env or wrapper, from the outside in
+- `wrapper.<Wrapper>`: the `step` of the wrapper minus the `step` it wraps, i.e. its own overhead
+
+The first five also count the calls made during `reset`.
+"""
+
+import time
+from collections import defaultdict
+
+from gym_dmc.gym.core import Wrapper
+
+
+class PerfStats:
+    """Wall time and number of calls per phase."""
+
+    def __init__(self):
+        self.totals = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.layers = []  # the `step.<Env>` phases, from the outermost wrapper in.
+
+    def reset(self):
+        self.totals.clear()
+        self.calls.clear()
+
+    def summary(self):
+        """{phase: {"calls", "total", "mean"}} with the times in seconds."""
+        phases = {phase: (self.calls[phase], total) for phase, total in self.totals.items()}
+        for outer, inner in zip(self.layers, self.layers[1:]):
+            if outer in self.totals:
+                wrapper = "wrapper." + outer[len("step.") :]
+                phases[wrapper] = self.calls[outer], self.totals[outer] - self.totals[inner]
+        return {phase: dict(calls=calls, total=total, mean=total / max(calls, 1)) for phase, (calls, total) in phases.items()}
+
+
+class _Timed:
+    """Adds the time of each call of `fn` to `phase`. Other attributes are forwarded to `fn`."""
+
+    def __init__(self, fn, stats, phase):
+        self.fn = fn
+        self.stats = stats
+        self.phase = phase
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.fn(*args, **kwargs)
+        finally:
+            self.stats.totals[self.phase] += time.perf_counter() - start
+            self.stats.calls[self.phase] += 1
+
+    def __getattr__(self, name):
+        return getattr(self.fn, name)
+
+
+def _time(obj, name, stats, phase):
+    value = getattr(obj, name)
+    if isinstance(value, _Timed):
+        value = value.fn
+    setattr(obj, name, _Timed(value, stats, phase))
+
+
+def _untime(obj, name):
+    value = vars(obj).get(name)
+    if not isinstance(value, _Timed):
+        return
+    # the methods are shadowed on the instance, the attributes such as `pixel_pipeline` are replaced.
+    if hasattr(type(obj), name):
+        delattr(obj, name)
+    else:
+        setattr(obj, name, value.fn)
+
+
+def _chain(env):
+    while True:
+        yield env
+        if not isinstance(env, Wrapper):
+            return
+        env = env.env
+
+
+def enable_perf_stats(env) -> PerfStats:
+    """Time the phases of `env` and of the wrappers around it. Returns the stats, which are also
+    available as `env.perf_stats()`."""
+    from gym_dmc.dmc_env import DMCEnv
+    from gym_dmc.wrappers.flat import FlattenObservation
+
+    stats = PerfStats()
+    for layer in _chain(env):
+        phase = f"step.{type(layer).__name__}"
+        while phase in stats.layers:
+            phase += "'"
+        stats.layers.append(phase)
+        _time(layer, "step", stats, phase)
+        if isinstance(layer, FlattenObservation):
+            _time(layer, "observation", stats, "flatten")
+
+    unwrapped = env.unwrapped
+    assert isinstance(unwrapped, DMCEnv), f"perf stats are only supported for DMCEnv, got {unwrapped}"
+    _time(unwrapped.env.physics, "step", stats, "physics")
+    _time(unwrapped, "_get_obs", stats, "observation")
+    _time(unwrapped, "_render_physics", stats, "render")
+    _time(unwrapped, "pixel_pipeline", stats, "pixels")
+    unwrapped._perf_stats = stats
+    return stats
+
+
+def disable_perf_stats(env):
+    """Remove the timing added by `enable_perf_stats`."""
+    for layer in _chain(env):
+        _untime(layer, "step")
+        _untime(layer, "observation")
+
+    unwrapped = env.unwrapped
+    _untime(unwrapped.env.physics, "step")
+    for name in ("_get_obs", "_render_physics", "pixel_pipeline"):
+        _untime(unwrapped, name)
+    unwrapped._perf_stats = None
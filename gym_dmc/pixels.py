@@ -0,0 +1,115 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
+# ITU-R BT.601 luma weights in 8-bit fixed point, they sum up to 256.
+LUMA_WEIGHTS = (77, 150, 29)
+
+
+def to_gray(img, out=None, scratch=None):
+    """Integer luminance of an `(H, W, 3)` uint8 image, as an `(H, W)` uint8 array.
+
+    Computes `(77 R + 150 G + 29 B) >> 8` in uint16, instead of promoting the
+    whole frame to float64 like `img.mean(axis=-1)`.
+
+    Args:
+        out: Optional `(H, W)` array to write the result into, it may be a
+            strided view (e.g. one channel of a channels-first frame).
+        scratch: Optional pair of `(H, W)` uint16 arrays to reuse for the
+            intermediate sums.
+    """
+    if scratch is None:
+        scratch = np.empty(img.shape[:2], dtype=np.uint16), np.empty(img.shape[:2], dtype=np.uint16)
+    acc, tmp = scratch
+    np.multiply(img[..., 0], LUMA_WEIGHTS[0], out=acc, dtype=np.uint16)
+    np.multiply(img[..., 1], LUMA_WEIGHTS[1], out=tmp, dtype=np.uint16)
+    np.add(acc, tmp, out=acc)
+    np.multiply(img[..., 2], LUMA_WEIGHTS[2], out=tmp, dtype=np.uint16)
+    np.add(acc, tmp, out=acc)
+    np.right_shift(acc, 8, out=acc)
+
+    if out is None:
+        return acc.astype(np.uint8)
+    np.copyto(out, acc, casting="unsafe")
+    return out
+
+
+class PixelPipeline:
+    """Turns rendered `(H, W, 3)` uint8 frames into pixel observations.
+
+    Cropping is a slice of the rendered frame. Resizing is a nearest-neighbour
+    lookup with precomputed row and column indices. Grayscale conversion uses
+    integer luminance (see `to_gray`). The result is written straight into a
+    contiguous array with the final layout: `(C, H, W)` when
+    `channels_first`, otherwise `(H, W, C)`. The intermediate arrays are
+    allocated once and reused for every frame.
+
+    Args:
+        height: Height of the rendered frames.
+        width: Width of the rendered frames.
+        gray_scale: Output a single luminance channel instead of RGB.
+        channels_first: Output `(C, H, W)` instead of `(H, W, C)`.
+        crop: Optional `(top, left, height, width)` window to cut out of the
+            rendered frame.
+        resize: Optional `(height, width)` to resize the (cropped) frame to.
+    """
+
+    def __init__(
+        self,
+        height: int,
+        width: int,
+        gray_scale: bool = False,
+        channels_first: bool = True,
+        crop: Optional[Sequence[int]] = None,
+        resize: Optional[Sequence[int]] = None,
+    ):
+        self.gray_scale = gray_scale
+        self.channels_first = channels_first
+
+        if crop is None:
+            crop = (0, 0, height, width)
+        top, left, crop_height, crop_width = crop
+        assert top + crop_height <= height and left + crop_width <= width, f"crop {crop} does not fit in {height}x{width}"
+        self._crop = (slice(top, top + crop_height), slice(left, left + crop_width))
+
+        self._resize = None
+        out_height, out_width = crop_height, crop_width
+        if resize is not None and tuple(resize) != (crop_height, crop_width):
+            out_height, out_width = resize
+            rows = (np.arange(out_height) * crop_height // out_height).astype(np.intp)
+            cols = (np.arange(out_width) * crop_width // out_width).astype(np.intp)
+            self._resize = rows, cols
+            self._rows_buffer = np.empty((out_height, crop_width, 3), dtype=np.uint8)
+            self._resized_buffer = np.empty((out_height, out_width, 3), dtype=np.uint8)
+
+        color_dim = 1 if gray_scale else 3
+        self.shape = (color_dim, out_height, out_width) if channels_first else (out_height, out_width, color_dim)
+        if gray_scale:
+            self._scratch = np.empty((out_height, out_width), dtype=np.uint16), np.empty((out_height, out_width), dtype=np.uint16)
+
+    def crop_resize(self, img):
+        """Apply only the crop and resize, to any `(H, W, ...)` image, e.g. depth or segmentation."""
+        img = img[self._crop]
+        if self._resize is not None:
+            rows, cols = self._resize
+            img = img[rows[:, None], cols]
+        return img
+
+    def __call__(self, img, out=None):
+        """Process one rendered frame, into `out` if given."""
+        if out is None:
+            out = np.empty(self.shape, dtype=np.uint8)
+
+        img = img[self._crop]
+        if self._resize is not None:
+            rows, cols = self._resize
+            np.take(img, rows, axis=0, out=self._rows_buffer)
+            img = np.take(self._rows_buffer, cols, axis=1, out=self._resized_buffer)
+
+        if self.gray_scale:
+            to_gray(img, out=out[0] if self.channels_first else out[..., 0], scratch=self._scratch)
+        elif self.channels_first:
+            np.copyto(out, img.transpose(2, 0, 1))
+        else:
+            np.copyto(out, img)
+        return out
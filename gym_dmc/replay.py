@@ -0,0 +1,207 @@
+import json
+import os
+import shutil
+import tempfile
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .gym.core import Wrapper
+from .gym.utils import seeding
+
+
+class PixelReplayBuffer:
+    """Replay buffer for `from_pixels` envs that stores every frame exactly once.
+
+    Frames go into a uint8 `np.memmap` on local disk, one slot per frame, in
+    the order they were received. Stacked observations and next-observations
+    are rebuilt from frame indices at sample time. So neither the k-fold
+    duplication of frame stacking nor the separate `next_obs` copy ever
+    reaches memory or disk. Stacks are clamped to the first frame of their
+    episode, the same as `FrameStack` after a reset.
+
+    Usage::
+
+        buffer = PixelReplayBuffer.from_env(env, capacity=1_000_000)
+        buffer.add_first(env.reset())
+        obs, reward, done, info = env.step(action)
+        buffer.add(action, reward, obs, done)
+        batch = buffer.sample(256)  # dict of obs, action, reward, next_obs, done
+        buffer.close()
+
+    or use the buffer as a context manager, which closes it on exit.
+
+    Args:
+        capacity: Number of frames to keep. The oldest frames are overwritten.
+        frame_shape: Shape of a single frame, e.g. `(3, 84, 84)`.
+        action_shape: Shape of a single action.
+        frame_stack: Number of frames in a stacked observation.
+        channels_first: Whether frames are stacked along the first (channels-
+            first) or the last axis.
+        frame_skip: The env's `frame_skip`, kept in the buffer metadata.
+        path: Directory for the memmap and its metadata. A temporary directory
+            is used by default, which `close` deletes.
+        seed: Seed for sampling.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        frame_shape: Sequence[int],
+        action_shape: Sequence[int],
+        frame_stack: int = 1,
+        channels_first: bool = True,
+        frame_skip: int = 1,
+        path: Optional[str] = None,
+        seed: Optional[int] = None,
+    ):
+        self.capacity = capacity
+        self.frame_shape = tuple(frame_shape)
+        self.frame_stack = frame_stack
+        self.channels_first = channels_first
+        self.frame_skip = frame_skip
+        self._owns_path = path is None
+        self.path = path or tempfile.mkdtemp(prefix="gym_dmc-replay-")
+        os.makedirs(self.path, exist_ok=True)
+
+        self._frames = np.lib.format.open_memmap(
+            os.path.join(self.path, "frames.npy"), mode="w+", dtype=np.uint8, shape=(capacity, *self.frame_shape)
+        )
+        # per frame slot: the action, reward and done of the transition that led to the frame.
+        self._actions = np.zeros((capacity, *action_shape), dtype=np.float32)
+        self._rewards = np.zeros((capacity,), dtype=np.float32)
+        self._dones = np.zeros((capacity,), dtype=np.bool_)
+        # the frame id of the first frame of the episode. Frames that start an episode have no transition.
+        self._episode_start = np.zeros((capacity,), dtype=np.int64)
+        self._has_transition = np.zeros((capacity,), dtype=np.bool_)
+        self._num_frames = 0
+        self._current_episode_start = None
+
+        self.np_random, _ = seeding.np_random(seed)
+
+        with open(os.path.join(self.path, "metadata.json"), "w") as f:
+            json.dump(self.metadata, f)
+
+    @classmethod
+    def from_env(cls, env, capacity: int, **kwargs):
+        """Read the frame shape, frame stack, layout and frame_skip from a (wrapped) pixel env."""
+        from .wrappers.frame_stack import FrameStack
+
+        frame_stack = 1
+        wrapper = env
+        while isinstance(wrapper, Wrapper):
+            if isinstance(wrapper, FrameStack):
+                frame_stack = wrapper.k
+            wrapper = wrapper.env
+
+        unwrapped = env.unwrapped
+        options = dict(
+            frame_shape=unwrapped.observation_space["pixels"].shape,
+            action_shape=env.action_space.shape,
+            frame_stack=frame_stack,
+            channels_first=unwrapped.channels_first,
+            frame_skip=unwrapped.frame_skip,
+        )
+        options.update(kwargs)
+        return cls(capacity, **options)
+
+    @property
+    def metadata(self) -> dict:
+        return dict(
+            capacity=self.capacity,
+            frame_shape=self.frame_shape,
+            frame_stack=self.frame_stack,
+            channels_first=self.channels_first,
+            frame_skip=self.frame_skip,
+        )
+
+    def close(self):
+        """Release the memmap, and delete the directory if the buffer created it. A `path` that was passed in
+        is kept, with the frames flushed to it."""
+        if self._frames is None:
+            return
+        self._frames.flush()
+        self._frames = None
+        if self._owns_path:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        """Number of transitions that can be sampled."""
+        stored = min(self._num_frames, self.capacity)
+        count = int(self._has_transition[:stored].sum())
+        oldest = self._num_frames - stored
+        # the observation frame of the oldest transition has been overwritten.
+        if oldest and self._has_transition[oldest % self.capacity]:
+            count -= 1
+        return count
+
+    def _last_frame(self, obs):
+        """Take the newest frame out of a stacked observation."""
+        obs = np.asarray(obs)
+        if obs.shape == self.frame_shape:
+            return obs
+        channels = self.frame_shape[0] if self.channels_first else self.frame_shape[-1]
+        return obs[-channels:] if self.channels_first else obs[..., -channels:]
+
+    def _write(self, frame, action=None, reward=0.0, done=False):
+        slot = self._num_frames % self.capacity
+        self._frames[slot] = self._last_frame(frame)
+        self._episode_start[slot] = self._current_episode_start
+        self._has_transition[slot] = action is not None
+        if action is not None:
+            self._actions[slot] = action
+        self._rewards[slot] = reward
+        self._dones[slot] = done
+        self._num_frames += 1
+
+    def add_first(self, obs):
+        """Start a new episode with the observation returned by `reset`."""
+        self._current_episode_start = self._num_frames
+        self._write(obs)
+
+    def add(self, action, reward, next_obs, done):
+        """Add a transition. Its observation is the frame added before it."""
+        assert self._current_episode_start is not None, "call `add_first` with the first observation of the episode."
+        self._write(next_obs, action, reward, done)
+        if done:
+            self._current_episode_start = None
+
+    def _stack(self, frames):
+        """(B, k, *frame_shape) -> (B, *stacked_shape)"""
+        batch_size = frames.shape[0]
+        if self.channels_first:
+            return frames.reshape(batch_size, -1, *self.frame_shape[1:])
+        frames = np.moveaxis(frames, 1, -2)
+        return frames.reshape(*frames.shape[:-2], -1)
+
+    def sample(self, batch_size: int) -> dict:
+        """Sample a batch of transitions uniformly, with vectorized stacking."""
+        assert len(self), "the buffer has no transitions to sample from."
+        oldest = max(self._num_frames - self.capacity, 0)
+
+        # frame ids of the next observations. Their observation frame (id - 1) has to be in the buffer too.
+        ids = np.empty((0,), dtype=np.int64)
+        while len(ids) < batch_size:
+            candidates = self.np_random.integers(oldest + 1, self._num_frames, size=batch_size)
+            ids = np.concatenate([ids, candidates[self._has_transition[candidates % self.capacity]]])
+        ids = ids[:batch_size]
+        slots = ids % self.capacity
+
+        # one window of k + 1 frames per transition covers both the observation and the next observation.
+        first = np.maximum(self._episode_start[slots], oldest)[:, None]
+        window = np.maximum(ids[:, None] + np.arange(-self.frame_stack, 1), first)
+        frames = self._frames[window % self.capacity]
+
+        return dict(
+            obs=self._stack(frames[:, :-1]),
+            action=self._actions[slots],
+            reward=self._rewards[slots],
+            next_obs=self._stack(frames[:, 1:]),
+            done=self._dones[slots],
+        )
@@ -0,0 +1,11 @@
+from .vector_env import VectorEnv
+from .sync_vector_env import SyncVectorEnv
+from .subproc_vector_env import SubprocVectorEnv
+from .thread_vector_env import ThreadVectorEnv
+
+__all__ = [
+    "VectorEnv",
+    "SyncVectorEnv",
+    "SubprocVectorEnv",
+    "ThreadVectorEnv",
+]
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing as mp
+import sys
+import traceback
+from multiprocessing.connection import wait
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+from ..gym import spaces
+from ..gym.core import Env
+from .utils import (
+    create_shared_memory,
+    deepcopy_items,
+    from_shared_memory,
+    iter_shared_memory,
+    read_from,
+    step_and_autoreset,
+    write_to,
+)
+from .vector_env import VectorEnv
+
+
+class SubprocVectorEnv(VectorEnv):
+    """Runs each environment in its own worker process.
+
+    The workers write their observations, including ``from_pixels`` uint8
+    frames, directly into ``multiprocessing.shared_memory`` blocks. Only the
+    actions, rewards, dones and infos go through the pipes, so no frame is
+    pickled on the way back to the parent.
+
+    Example::
+
+        >>> env = SubprocVectorEnv([partial(gym_dmc.make, "dmc:Walker-walk-v1", from_pixels=True) for _ in range(8)])
+        >>> obs = env.reset()                            # (8, 3, 84, 84), uint8
+
+    Besides the lockstep `step`, the env supports EnvPool-style partial
+    batches, so that slow domains do not hold back the whole batch::
+
+        >>> env.send(actions)                            # step all 8 envs
+        >>> obs, rewards, dones, infos, env_ids = env.recv(min_ready=4)
+        >>> env.send(policy(obs), env_ids)               # only the 4 that came back
+
+    Args:
+        env_fns: Callables that create the sub-environments. They have to be
+            picklable unless the `fork` start method is used, so prefer
+            ``functools.partial(gym_dmc.make, ...)`` over lambdas.
+        observation_space: Observation space of a single sub-environment. If
+            None, a throw-away env is created in the parent to read it.
+        action_space: Action space of a single sub-environment.
+        copy: If False, `reset` and `step` return views of the shared memory
+            blocks, which the workers overwrite on the next call.
+        context: Start method passed to ``multiprocessing.get_context``.
+    """
+
+    def __init__(
+        self,
+        env_fns: Sequence[Callable[[], Env]],
+        observation_space: Optional[spaces.Space] = None,
+        action_space: Optional[spaces.Space] = None,
+        copy: bool = True,
+        context: Optional[str] = None,
+    ):
+        if observation_space is None or action_space is None:
+            dummy_env = env_fns[0]()
+            observation_space = observation_space or dummy_env.observation_space
+            action_space = action_space or dummy_env.action_space
+            dummy_env.close()
+            del dummy_env
+
+        super().__init__(num_envs=len(env_fns), observation_space=observation_space, action_space=action_space)
+        self.copy = copy
+
+        self._shared_memory = create_shared_memory(self.single_observation_space, n=self.num_envs)
+        self._observations = from_shared_memory(self.single_observation_space, self._shared_memory, n=self.num_envs)
+        self._rewards = np.zeros((self.num_envs,), dtype=np.float64)
+        self._dones = np.zeros((self.num_envs,), dtype=np.bool_)
+
+        self._stepping = []
+
+        ctx = mp.get_context(context)
+        self.parent_pipes, self.processes = [], []
+        for index, env_fn in enumerate(env_fns):
+            parent_pipe, child_pipe = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                name=f"gym_dmc-worker-{index}",
+                args=(index, env_fn, child_pipe, parent_pipe, self._shared_memory, self.single_observation_space, self.num_envs),
+                daemon=True,
+            )
+            self.parent_pipes.append(parent_pipe)
+            self.processes.append(process)
+            process.start()
+            child_pipe.close()
+
+    def _call(self, command, data=None):
+        """Send the same command to every worker and return their results in order."""
+        assert not self._stepping, f"envs {self._stepping} are still stepping, call `recv` first."
+        for pipe, item in zip(self.parent_pipes, data if data is not None else [None] * self.num_envs):
+            pipe.send((command, item))
+        return [self._receive(pipe) for pipe in self.parent_pipes]
+
+    @staticmethod
+    def _receive(pipe):
+        result, success = pipe.recv()
+        if not success:
+            raise RuntimeError(f"Exception raised in gym_dmc worker:\n{result}")
+        return result
+
+    async def _call_async(self, command, data=None):
+        assert not self._stepping, f"envs {self._stepping} are still stepping, call `recv` first."
+        for pipe, item in zip(self.parent_pipes, data if data is not None else [None] * self.num_envs):
+            pipe.send((command, item))
+        return await asyncio.gather(*[self._receive_async(pipe) for pipe in self.parent_pipes])
+
+    @classmethod
+    async def _receive_async(cls, pipe):
+        """Wait for the pipe on the event loop instead of blocking a thread on `recv`."""
+        loop = asyncio.get_running_loop()
+        if not pipe.poll():
+            readable = loop.create_future()
+
+            def on_readable():
+                if not readable.done():
+                    readable.set_result(None)
+
+            try:
+                loop.add_reader(pipe.fileno(), on_readable)
+            except NotImplementedError:  # e.g. the proactor event loop on Windows
+                return await loop.run_in_executor(None, cls._receive, pipe)
+            try:
+                await readable
+            finally:
+                loop.remove_reader(pipe.fileno())
+        return cls._receive(pipe)
+
+    def seed(self, seed=None):
+        return self._call("seed", super().seed(seed))
+
+    def _outputs(self, results):
+        for i, (reward, done, _) in enumerate(results):
+            self._rewards[i], self._dones[i] = reward, done
+        infos = tuple(info for *_, info in results)
+
+        if not self.copy:
+            return self._observations, self._rewards, self._dones, infos
+        return deepcopy_items(self._observations), np.copy(self._rewards), np.copy(self._dones), infos
+
+    def reset(self, **kwargs):
+        self._dones[:] = False
+        self._call("reset", [kwargs] * self.num_envs)
+        return deepcopy_items(self._observations) if self.copy else self._observations
+
+    def step(self, actions):
+        return self._outputs(self._call("step", list(actions)))
+
+    async def reset_async(self, **kwargs):
+        self._dones[:] = False
+        await self._call_async("reset", [kwargs] * self.num_envs)
+        return deepcopy_items(self._observations) if self.copy else self._observations
+
+    async def step_async(self, actions):
+        return self._outputs(await self._call_async("step", list(actions)))
+
+    def send(self, actions, env_ids=None):
+        """Start stepping the envs `env_ids` (all of them by default) without waiting for the results.
+
+        An env can only be sent a new action after its previous result came
+        back through `recv`. The arguments are checked before any env is sent
+        an action.
+
+        Raises:
+            ValueError: if there is not one action per env, an env id is
+                repeated or out of range, or an env is still stepping.
+        """
+        env_ids = list(range(self.num_envs)) if env_ids is None else [int(env_id) for env_id in env_ids]
+        if len(actions) != len(env_ids):
+            raise ValueError(f"got {len(actions)} actions for {len(env_ids)} envs.")
+        if len(set(env_ids)) != len(env_ids):
+            raise ValueError(f"the env ids {env_ids} are not unique.")
+        for env_id in env_ids:
+            if not 0 <= env_id < self.num_envs:
+                raise ValueError(f"env {env_id} does not exist, there are {self.num_envs} envs.")
+            if env_id in self._stepping:
+                raise ValueError(f"env {env_id} is still stepping, call `recv` first.")
+
+        for env_id, action in zip(env_ids, actions):
+            self.parent_pipes[env_id].send(("step", action))
+            self._stepping.append(env_id)
+
+    def recv(self, min_ready=None):
+        """Return the results of the first `min_ready` envs that finished stepping.
+
+        Waits for all envs that are stepping if `min_ready` is None. The
+        batch rows follow the order in which the envs finished, and the
+        returned `env_ids` tell which env each row belongs to. The
+        observations are always copies, because the other workers keep
+        writing into the shared memory.
+
+        Returns:
+            (observations, rewards, dones, infos, env_ids)
+        """
+        min_ready = len(self._stepping) if min_ready is None else min_ready
+        assert 0 < min_ready <= len(self._stepping), f"can not wait for {min_ready} of {len(self._stepping)} stepping envs."
+
+        env_ids, results = [], []
+        while len(env_ids) < min_ready:
+            ready = wait([self.parent_pipes[env_id] for env_id in self._stepping])
+            for env_id in [env_id for env_id in self._stepping if self.parent_pipes[env_id] in ready]:
+                results.append(self._receive(self.parent_pipes[env_id]))
+                self._stepping.remove(env_id)
+                env_ids.append(env_id)
+                if len(env_ids) == min_ready:
+                    break
+
+        env_ids = np.asarray(env_ids, dtype=np.int64)
+        rewards = np.array([reward for reward, *_ in results], dtype=np.float64)
+        dones = np.array([done for _, done, _ in results], dtype=np.bool_)
+        infos = tuple(info for *_, info in results)
+        return read_from(self.single_observation_space, self._observations, env_ids), rewards, dones, infos, env_ids
+
+    def close_extras(self, timeout=None, **kwargs):
+        for pipe in self.parent_pipes:
+            try:
+                pipe.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        for pipe in self.parent_pipes:
+            pipe.close()
+
+        self._observations = None
+        for shm in iter_shared_memory(self._shared_memory):
+            shm.close()
+            shm.unlink()
+
+
+def _worker(index, env_fn, pipe, parent_pipe, shared_memory, observation_space, num_envs):
+    parent_pipe.close()
+    env = env_fn()
+    observations = from_shared_memory(observation_space, shared_memory, n=num_envs)
+    try:
+        while True:
+            command, data = pipe.recv()
+            if command == "reset":
+                write_to(observation_space, observations, index, env.reset(**data))
+                pipe.send((None, True))
+            elif command == "step":
+                pipe.send((step_and_autoreset(env, data, observation_space, observations, index), True))
+            elif command == "seed":
+                pipe.send((env.seed(data), True))
+            elif command == "close":
+                break
+            else:
+                raise RuntimeError(f"Received unknown command `{command}`.")
+    except (KeyboardInterrupt, EOFError):
+        pass
+    except Exception:
+        pipe.send(("".join(traceback.format_exception(*sys.exc_info())), False))
+    finally:
+        del observations
+        env.close()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from typing import Callable, Sequence
+
+import numpy as np
+
+from ..gym.core import Env
+from .utils import create_empty_array, deepcopy_items, step_and_autoreset, write_to
+from .vector_env import VectorEnv
+
+
+class SyncVectorEnv(VectorEnv):
+    """Steps a list of environments one after the other in the current process.
+
+    All outputs are written into batch buffers that are allocated once in the
+    constructor, so a step does not build any per-env arrays on top of what
+    the environments themselves return.
+
+    Example::
+
+        >>> env = SyncVectorEnv([lambda: gym_dmc.make("dmc:Walker-walk-v1") for _ in range(64)])
+        >>> obs = env.reset()                            # (64, 24)
+        >>> obs, rewards, dones, infos = env.step(env.action_space.sample())
+
+    Args:
+        env_fns: Callables that create the sub-environments.
+        copy: If False, `reset` and `step` return the internal batch buffers
+            themselves, which are overwritten on the next call.
+    """
+
+    def __init__(self, env_fns: Sequence[Callable[[], Env]], copy: bool = True):
+        self.envs = [env_fn() for env_fn in env_fns]
+        self.copy = copy
+        super().__init__(
+            num_envs=len(self.envs),
+            observation_space=self.envs[0].observation_space,
+            action_space=self.envs[0].action_space,
+        )
+
+        self._observations = create_empty_array(self.single_observation_space, n=self.num_envs, fn=np.zeros)
+        self._rewards = np.zeros((self.num_envs,), dtype=np.float64)
+        self._dones = np.zeros((self.num_envs,), dtype=np.bool_)
+
+    def seed(self, seed=None):
+        seeds = super().seed(seed)
+        return [env.seed(s) for env, s in zip(self.envs, seeds)]
+
+    def reset(self, **kwargs):
+        self._dones[:] = False
+        for i, env in enumerate(self.envs):
+            write_to(self.single_observation_space, self._observations, i, env.reset(**kwargs))
+        return deepcopy_items(self._observations) if self.copy else self._observations
+
+    def step(self, actions):
+        infos = []
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            self._rewards[i], self._dones[i], info = step_and_autoreset(env, action, self.single_observation_space, self._observations, i)
+            infos.append(info)
+
+        if not self.copy:
+            return self._observations, self._rewards, self._dones, tuple(infos)
+        return deepcopy_items(self._observations), np.copy(self._rewards), np.copy(self._dones), tuple(infos)
+
+    def close_extras(self, **kwargs):
+        for env in self.envs:
+            env.close()
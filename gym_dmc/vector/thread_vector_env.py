@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+from ..gym.core import Env
+from .utils import create_empty_array, deepcopy_items, step_and_autoreset, write_to
+from .vector_env import VectorEnv
+
+
+class ThreadVectorEnv(VectorEnv):
+    """Steps the environments on a thread pool in the current process.
+
+    MuJoCo's native ``mj_step`` releases the GIL, so the physics of several
+    environments advances on several cores at once, while the Python glue
+    around it (`before_step`, rewards, observations) still runs one thread at
+    a time. There is no process startup or IPC, which makes this the cheapest
+    option for state-based tasks whose physics step is short.
+
+    Each env always runs on the same thread, env ``i`` on thread
+    ``i % max_workers``: the GL context of a pixel env can only be made
+    current on the thread that created it.
+
+    Args:
+        env_fns: Callables that create the sub-environments.
+        max_workers: Number of threads. Defaults to one thread per env.
+        copy: If False, `reset` and `step` return the internal batch buffers
+            themselves, which are overwritten on the next call.
+    """
+
+    def __init__(self, env_fns: Sequence[Callable[[], Env]], max_workers: Optional[int] = None, copy: bool = True):
+        self.envs = [env_fn() for env_fn in env_fns]
+        self.copy = copy
+        super().__init__(
+            num_envs=len(self.envs),
+            observation_space=self.envs[0].observation_space,
+            action_space=self.envs[0].action_space,
+        )
+        num_workers = min(max_workers or self.num_envs, self.num_envs)
+        workers = [ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"gym_dmc_{i}") for i in range(num_workers)]
+        self.executors = [workers[i % num_workers] for i in range(self.num_envs)]
+
+        self._observations = create_empty_array(self.single_observation_space, n=self.num_envs, fn=np.zeros)
+        self._rewards = np.zeros((self.num_envs,), dtype=np.float64)
+        self._dones = np.zeros((self.num_envs,), dtype=np.bool_)
+
+    def seed(self, seed=None):
+        seeds = super().seed(seed)
+        return [env.seed(s) for env, s in zip(self.envs, seeds)]
+
+    def _reset_env(self, index, kwargs):
+        write_to(self.single_observation_space, self._observations, index, self.envs[index].reset(**kwargs))
+
+    def _step_env(self, index, action):
+        self._rewards[index], self._dones[index], info = step_and_autoreset(
+            self.envs[index], action, self.single_observation_space, self._observations, index
+        )
+        return info
+
+    def _outputs(self, infos):
+        if not self.copy:
+            return self._observations, self._rewards, self._dones, infos
+        return deepcopy_items(self._observations), np.copy(self._rewards), np.copy(self._dones), infos
+
+    def reset(self, **kwargs):
+        self._dones[:] = False
+        futures = [self.executors[i].submit(self._reset_env, i, kwargs) for i in range(self.num_envs)]
+        for future in futures:
+            future.result()
+        return deepcopy_items(self._observations) if self.copy else self._observations
+
+    def step(self, actions):
+        futures = [self.executors[i].submit(self._step_env, i, action) for i, action in enumerate(actions)]
+        return self._outputs(tuple(future.result() for future in futures))
+
+    async def reset_async(self, **kwargs):
+        self._dones[:] = False
+        futures = [asyncio.wrap_future(self.executors[i].submit(self._reset_env, i, kwargs)) for i in range(self.num_envs)]
+        await asyncio.gather(*futures)
+        return deepcopy_items(self._observations) if self.copy else self._observations
+
+    async def step_async(self, actions):
+        futures = [asyncio.wrap_future(self.executors[i].submit(self._step_env, i, action)) for i, action in enumerate(actions)]
+        return self._outputs(tuple(await asyncio.gather(*futures)))
+
+    def close_extras(self, **kwargs):
+        # free the GL contexts on the threads that they are current on.
+        futures = [executor.submit(env.close) for env, executor in zip(self.envs, self.executors)]
+        for future in futures:
+            future.result()
+        for executor in set(self.executors):
+            executor.shutdown(wait=True)
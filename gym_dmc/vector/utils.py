@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from functools import singledispatch
+
+import numpy as np
+
+from ..gym.spaces import Box, Dict, Discrete, MultiBinary, MultiDiscrete, Space, Tuple
+
+
+@singledispatch
+def batch_space(space: Space, n: int = 1) -> Space:
+    """Create a space of `n` stacked copies of `space`.
+
+    The batched space has a leading dimension of size `n`, matching the arrays
+    allocated by ``create_empty_array(space, n)``.
+    """
+    raise NotImplementedError(f"Unknown space: `{space}`")
+
+
+@batch_space.register(Box)
+def _batch_space_box(space: Box, n: int = 1) -> Box:
+    repeats = (n,) + (1,) * space.low.ndim
+    low, high = np.tile(space.low, repeats), np.tile(space.high, repeats)
+    return Box(low=low, high=high, dtype=space.dtype)
+
+
+@batch_space.register(Discrete)
+def _batch_space_discrete(space: Discrete, n: int = 1) -> MultiDiscrete:
+    return MultiDiscrete(np.full((n,), space.n, dtype=space.dtype), dtype=space.dtype)
+
+
+@batch_space.register(MultiDiscrete)
+def _batch_space_multidiscrete(space: MultiDiscrete, n: int = 1) -> MultiDiscrete:
+    repeats = (n,) + (1,) * space.nvec.ndim
+    return MultiDiscrete(np.tile(space.nvec, repeats), dtype=space.dtype)
+
+
+@batch_space.register(MultiBinary)
+def _batch_space_multibinary(space: MultiBinary, n: int = 1) -> MultiBinary:
+    return MultiBinary((n,) + space.shape)
+
+
+@batch_space.register(Tuple)
+def _batch_space_tuple(space: Tuple, n: int = 1) -> Tuple:
+    return Tuple(tuple(batch_space(s, n) for s in space.spaces))
+
+
+@batch_space.register(Dict)
+def _batch_space_dict(space: Dict, n: int = 1) -> Dict:
+    return Dict(OrderedDict([(key, batch_space(s, n)) for key, s in space.spaces.items()]))
+
+
+@singledispatch
+def create_empty_array(space: Space, n: int = 1, fn=np.zeros):
+    """Allocate the buffer that holds `n` samples of `space`.
+
+    Returns a single array with a leading dimension of size `n` for the array
+    spaces, and a (nested) ``OrderedDict`` / ``tuple`` of such arrays for the
+    container spaces.
+    """
+    raise NotImplementedError(f"Unknown space: `{space}`")
+
+
+@create_empty_array.register(Box)
+@create_empty_array.register(Discrete)
+@create_empty_array.register(MultiDiscrete)
+@create_empty_array.register(MultiBinary)
+def _create_empty_array_base(space, n: int = 1, fn=np.zeros) -> np.ndarray:
+    return fn((n,) + space.shape, dtype=space.dtype)
+
+
+@create_empty_array.register(Tuple)
+def _create_empty_array_tuple(space: Tuple, n: int = 1, fn=np.zeros) -> tuple:
+    return tuple(create_empty_array(s, n=n, fn=fn) for s in space.spaces)
+
+
+@create_empty_array.register(Dict)
+def _create_empty_array_dict(space: Dict, n: int = 1, fn=np.zeros) -> OrderedDict:
+    return OrderedDict([(key, create_empty_array(s, n=n, fn=fn)) for key, s in space.spaces.items()])
+
+
+@singledispatch
+def write_to(space: Space, out, index, value) -> None:
+    """Write a single sample `value` of `space` into row `index` of `out`.
+
+    `out` is a buffer created by ``create_empty_array``. The write happens in
+    place, so no intermediate array is allocated for the batch.
+    """
+    raise NotImplementedError(f"Unknown space: `{space}`")
+
+
+@write_to.register(Box)
+@write_to.register(Discrete)
+@write_to.register(MultiDiscrete)
+@write_to.register(MultiBinary)
+def _write_to_base(space, out: np.ndarray, index, value) -> None:
+    out[index] = value
+
+
+@write_to.register(Tuple)
+def _write_to_tuple(space: Tuple, out: tuple, index, value) -> None:
+    for s, out_part, value_part in zip(space.spaces, out, value):
+        write_to(s, out_part, index, value_part)
+
+
+@write_to.register(Dict)
+def _write_to_dict(space: Dict, out: dict, index, value) -> None:
+    for key, s in space.spaces.items():
+        write_to(s, out[key], index, value[key])
+
+
+@singledispatch
+def read_from(space: Space, items, index):
+    """Read rows `index` of a buffer created by ``create_empty_array``.
+
+    Indexing with a slice returns views into the buffer, an index array
+    returns copies.
+    """
+    raise NotImplementedError(f"Unknown space: `{space}`")
+
+
+@read_from.register(Box)
+@read_from.register(Discrete)
+@read_from.register(MultiDiscrete)
+@read_from.register(MultiBinary)
+def _read_from_base(space, items: np.ndarray, index) -> np.ndarray:
+    return items[index]
+
+
+@read_from.register(Tuple)
+def _read_from_tuple(space: Tuple, items: tuple, index) -> tuple:
+    return tuple(read_from(s, part, index) for s, part in zip(space.spaces, items))
+
+
+@read_from.register(Dict)
+def _read_from_dict(space: Dict, items: dict, index) -> OrderedDict:
+    return OrderedDict([(key, read_from(s, items[key], index)) for key, s in space.spaces.items()])
+
+
+def deepcopy_items(items):
+    """Copy a (nested) batch buffer so that it can be handed to the caller."""
+    if isinstance(items, np.ndarray):
+        return items.copy()
+    elif isinstance(items, tuple):
+        return tuple(deepcopy_items(part) for part in items)
+    elif isinstance(items, dict):
+        return OrderedDict([(key, deepcopy_items(value)) for key, value in items.items()])
+    raise TypeError(f"Unexpected batch item of type {type(items)}")
+
+
+def step_and_autoreset(env, action, observation_space: Space, observations, index):
+    """Step `env` and write its observation to `observations[index]`, resetting it first when the episode is
+    done. The last observation of the episode then goes to `info["terminal_observation"]`.
+
+    Returns `(reward, done, info)`.
+    """
+    observation, reward, done, info = env.step(action)
+    if done:
+        # read the lazy info entries before the reset expires them
+        info = dict(info)
+        info["terminal_observation"] = observation
+        observation = env.reset()
+    write_to(observation_space, observations, index, observation)
+    return reward, done, info
+
+
+@singledispatch
+def create_shared_memory(space: Space, n: int = 1):
+    """Allocate ``multiprocessing.shared_memory`` blocks that hold `n` samples of `space`.
+
+    Returns one ``SharedMemory`` per array leaf of the space, nested the same
+    way as ``create_empty_array``.
+    """
+    raise NotImplementedError(f"Unknown space: `{space}`")
+
+
+@create_shared_memory.register(Box)
+@create_shared_memory.register(Discrete)
+@create_shared_memory.register(MultiDiscrete)
+@create_shared_memory.register(MultiBinary)
+def _create_base_shared_memory(space, n: int = 1):
+    from multiprocessing.shared_memory import SharedMemory
+
+    size = n * int(np.prod(space.shape, dtype=np.int64)) * space.dtype.itemsize
+    return SharedMemory(create=True, size=max(size, 1))
+
+
+@create_shared_memory.register(Tuple)
+def _create_tuple_shared_memory(space: Tuple, n: int = 1) -> tuple:
+    return tuple(create_shared_memory(s, n=n) for s in space.spaces)
+
+
+@create_shared_memory.register(Dict)
+def _create_dict_shared_memory(space: Dict, n: int = 1) -> OrderedDict:
+    return OrderedDict([(key, create_shared_memory(s, n=n)) for key, s in space.spaces.items()])
+
+
+@singledispatch
+def from_shared_memory(space: Space, shared_memory, n: int = 1):
+    """Create NumPy views of shape ``(n, *space.shape)`` onto the blocks from ``create_shared_memory``.
+
+    The views do not copy: writes from any process attached to the blocks are
+    visible through them.
+    """
+    raise NotImplementedError(f"Unknown space: `{space}`")
+
+
+@from_shared_memory.register(Box)
+@from_shared_memory.register(Discrete)
+@from_shared_memory.register(MultiDiscrete)
+@from_shared_memory.register(MultiBinary)
+def _from_base_shared_memory(space, shared_memory, n: int = 1) -> np.ndarray:
+    return np.ndarray((n,) + space.shape, dtype=space.dtype, buffer=shared_memory.buf)
+
+
+@from_shared_memory.register(Tuple)
+def _from_tuple_shared_memory(space: Tuple, shared_memory: tuple, n: int = 1) -> tuple:
+    return tuple(from_shared_memory(s, shm, n=n) for s, shm in zip(space.spaces, shared_memory))
+
+
+@from_shared_memory.register(Dict)
+def _from_dict_shared_memory(space: Dict, shared_memory: dict, n: int = 1) -> OrderedDict:
+    return OrderedDict([(key, from_shared_memory(s, shared_memory[key], n=n)) for key, s in space.spaces.items()])
+
+
+def iter_shared_memory(shared_memory):
+    """Iterate over the ``SharedMemory`` leaves of a nested structure."""
+    if isinstance(shared_memory, tuple):
+        for part in shared_memory:
+            yield from iter_shared_memory(part)
+    elif isinstance(shared_memory, dict):
+        for part in shared_memory.values():
+            yield from iter_shared_memory(part)
+    else:
+        yield shared_memory
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from functools import partial
+from typing import Tuple
+
+import numpy as np
+
+from ..gym import spaces
+from ..gym.core import Env
+from .utils import batch_space
+
+
+class VectorEnv(Env):
+    """Base class for environments that step `num_envs` copies of a task in lockstep.
+
+    The observations, rewards and dones of all copies are returned as single
+    arrays with a leading batch dimension of size `num_envs`. The infos come
+    back as a tuple of per-env dictionaries.
+
+    Episodes are reset automatically: when a sub-environment is done, the
+    returned observation is the first observation of the next episode, and the
+    last observation of the finished episode is kept in
+    ``info["terminal_observation"]``.
+
+    Args:
+        num_envs: Number of sub-environments.
+        observation_space: Observation space of a single sub-environment.
+        action_space: Action space of a single sub-environment.
+    """
+
+    def __init__(self, num_envs: int, observation_space: spaces.Space, action_space: spaces.Space):
+        self.num_envs = num_envs
+        self.single_observation_space = observation_space
+        self.single_action_space = action_space
+        self.observation_space = batch_space(observation_space, n=num_envs)
+        self.action_space = batch_space(action_space, n=num_envs)
+        self.closed = False
+
+    def reset(self, **kwargs):
+        raise NotImplementedError
+
+    def step(self, actions) -> Tuple[object, np.ndarray, np.ndarray, tuple]:
+        raise NotImplementedError
+
+    def render(self, mode="human"):
+        raise NotImplementedError(f"{type(self).__name__} does not support rendering.")
+
+    def close_extras(self, **kwargs):
+        """Clean up the extra resources of the subclass, e.g. workers or threads."""
+        pass
+
+    def close(self, **kwargs):
+        if self.closed:
+            return
+        self._close_async_executor(partial(self.close_extras, **kwargs))
+        self.closed = True
+
+    def seed(self, seed=None):
+        """Seed every sub-environment, with `seed + i` for the i-th one if `seed` is an int."""
+        if seed is None:
+            return [None for _ in range(self.num_envs)]
+        if isinstance(seed, int):
+            return [seed + i for i in range(self.num_envs)]
+        assert len(seed) == self.num_envs, f"expected {self.num_envs} seeds, got {len(seed)}."
+        return list(seed)
+
+    def __del__(self):
+        if not getattr(self, "closed", True):
+            self.close()
+
+    def __len__(self):
+        return self.num_envs
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.num_envs})"
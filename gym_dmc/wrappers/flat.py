@@ -1,21 +1,63 @@
+import numpy as np
+
 from gym_dmc.gym import spaces
 from gym_dmc.gym.core import ObservationWrapper
 
 
+def compile_flatten_plan(space):
+    """Precompute how `spaces.flatten(space, obs)` lays out an observation.
+
+    Returns a list of ``(key, slice, subspace)`` entries, one per key of a
+    `Dict` space, in the order `spaces.flatten` concatenates them. A
+    non-`Dict` space gives a single entry with key None.
+    """
+    items = space.spaces.items() if isinstance(space, spaces.Dict) else [(None, space)]
+
+    plan, start = [], 0
+    for key, subspace in items:
+        stop = start + spaces.flatdim(subspace)
+        plan.append((key, slice(start, stop), subspace))
+        start = stop
+    return plan
+
+
 class FlattenObservation(ObservationWrapper):
     """Observation wrapper that flattens the observation.
 
+    The flatten plan is compiled from the observation space once, and each
+    observation is copied into one preallocated array instead of going
+    through `spaces.flatten` and `np.concatenate` on every step.
+
     Note: Different from the default gym wrapper by adding _get_obs function
+
+    Args:
+        include_original: Add the original observation to the info dict as
+            ``info["observations_original"]``.
+        copy: If False, return the preallocated array itself. It is
+            overwritten by the next observation.
     """
 
-    def __init__(self, env, include_original=False):
+    def __init__(self, env, include_original=False, copy=True):
         super(FlattenObservation, self).__init__(env)
         self.__include_original = include_original
+        self.copy = copy
 
         self.observation_space = spaces.flatten_space(env.observation_space)
+        self._buffer = np.empty(self.observation_space.shape, dtype=self.observation_space.dtype)
+        # Box and MultiBinary entries are assigned to a view of their slice, reshaped to the
+        # entry's shape. The other spaces are flattened (e.g. one-hot encoded) into the slice.
+        self._plan = []
+        for key, sl, subspace in compile_flatten_plan(env.observation_space):
+            if isinstance(subspace, (spaces.Box, spaces.MultiBinary)):
+                self._plan.append((key, self._buffer[sl].reshape(subspace.shape), None))
+            else:
+                self._plan.append((key, self._buffer[sl], subspace))
 
     def observation(self, observation):
-        return spaces.flatten(self.env.observation_space, observation)
+        for key, view, subspace in self._plan:
+            x = observation if key is None else observation[key]
+            view[...] = x if subspace is None else spaces.flatten(subspace, x)
+        return self._buffer.copy() if self.copy else self._buffer
 
     def _get_obs(self):
         obs = self.env.unwrapped._get_obs()
@@ -0,0 +1,70 @@
+import numpy as np
+
+from gym_dmc.gym import spaces
+from gym_dmc.gym.core import Wrapper
+
+
+class FrameStack(Wrapper):
+    """Observation wrapper that stacks the last `k` observations.
+
+    Frames are stacked along the channel axis: `(k * C, H, W)` for
+    channels-first pixels, `(H, W, k * C)` for channels-last pixels (which
+    is read from `env.unwrapped.channels_first`) and `(k * D,)` for flat
+    state vectors. This is the same layout as `np.concatenate` on the last k
+    observations.
+
+    The frames live in a ring buffer that is allocated once. Each frame is
+    written twice, at slot `i` and `i + k`, so the last k frames always form
+    one contiguous slice of the buffer.
+
+    Args:
+        k: Number of frames to stack.
+        copy: If False, return that slice of the buffer as a view instead of
+            a contiguous copy. The view is only valid until the next step.
+    """
+
+    def __init__(self, env, k, copy=True):
+        super().__init__(env)
+        space = env.observation_space
+        assert isinstance(space, spaces.Box) and space.shape, f"FrameStack expects an array observation space, got {space}"
+
+        self.k = k
+        self.copy = copy
+        channels_last = len(space.shape) == 3 and not getattr(env.unwrapped, "channels_first", True)
+        self._axis = len(space.shape) - 1 if channels_last else 0
+        self._channels = space.shape[self._axis]
+
+        self.observation_space = spaces.Box(
+            low=np.concatenate([space.low] * k, axis=self._axis),
+            high=np.concatenate([space.high] * k, axis=self._axis),
+            dtype=space.dtype,
+        )
+        buffer_shape = list(space.shape)
+        buffer_shape[self._axis] *= 2 * k
+        self._buffer = np.zeros(buffer_shape, dtype=space.dtype)
+        self._pos = 0
+
+    def _slots(self, start, stop):
+        index = [slice(None)] * self._buffer.ndim
+        index[self._axis] = slice(start * self._channels, stop * self._channels)
+        return tuple(index)
+
+    def _push(self, frame):
+        self._buffer[self._slots(self._pos, self._pos + 1)] = frame
+        self._buffer[self._slots(self._pos + self.k, self._pos + self.k + 1)] = frame
+        self._pos = (self._pos + 1) % self.k
+
+    def observation(self):
+        frames = self._buffer[self._slots(self._pos, self._pos + self.k)]
+        return frames.copy() if self.copy else frames
+
+    def reset(self, **kwargs):
+        frame = self.env.reset(**kwargs)
+        for _ in range(self.k):
+            self._push(frame)
+        return self.observation()
+
+    def step(self, action):
+        frame, reward, done, info = self.env.step(action)
+        self._push(frame)
+        return self.observation(), reward, done, info
@@ -0,0 +1,143 @@
+import os
+import queue
+import threading
+
+import numpy as np
+
+from gym_dmc.gym.core import Wrapper
+from gym_dmc.vector.utils import create_empty_array, write_to
+
+
+def _named_arrays(name, items):
+    """Flatten the (nested) buffers of a container space into `name.key` entries for `np.savez`."""
+    if isinstance(items, dict):
+        for key, value in items.items():
+            yield from _named_arrays(f"{name}.{key}", value)
+    elif isinstance(items, tuple):
+        for i, value in enumerate(items):
+            yield from _named_arrays(f"{name}.{i}", value)
+    else:
+        yield name, items
+
+
+class TrajectoryRecorder(Wrapper):
+    """Streams every transition into preallocated chunks, which a background thread saves to
+    `directory/chunk_00000.npz`, `chunk_00001.npz`, ...
+
+    Each row holds the observation returned by `reset` or `step`, and for steps, the action that led
+    to it with its reward and done flags. `first` marks the rows written by `reset`, which have a zero
+    action and reward. `truncated` is the `TimeLimit.truncated` info of a `TimeLimit` wrapper inside the
+    recorder. Container observations are saved as `obs.<key>`.
+
+    There are `num_buffers` chunks. The env only waits on the disk when all of them are queued to be
+    written, which bounds the memory instead of letting a slow disk grow a queue.
+
+    Args:
+        directory: Where the chunks are written. It is created if it does not exist.
+        chunk_size: Number of rows per chunk.
+        record_sim_state: Also record `physics.get_state()` of the dm_control env as `sim_state`.
+        num_buffers: Number of chunks that can be filled or written at the same time.
+    """
+
+    def __init__(self, env, directory, chunk_size=1000, record_sim_state=False, num_buffers=2):
+        super().__init__(env)
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.record_sim_state = record_sim_state
+        os.makedirs(directory, exist_ok=True)
+
+        self._state_size = self.unwrapped.env.physics.get_state().size if record_sim_state else None
+
+        self._free = queue.Queue()
+        for _ in range(num_buffers):
+            self._free.put(self._allocate())
+        self._chunk = self._free.get()
+        self._row = 0
+        self._num_chunks = 0
+
+        self._error = None
+        self._pending = queue.Queue()
+        self._writer = threading.Thread(target=self._write_chunks, daemon=True)
+        self._writer.start()
+
+    def _allocate(self):
+        n = self.chunk_size
+        chunk = {
+            "obs": create_empty_array(self.observation_space, n),
+            "action": create_empty_array(self.action_space, n),
+            "reward": np.zeros(n, dtype=np.float64),
+            "done": np.zeros(n, dtype=bool),
+            "first": np.zeros(n, dtype=bool),
+            "truncated": np.zeros(n, dtype=bool),
+        }
+        if self.record_sim_state:
+            chunk["sim_state"] = np.zeros((n, self._state_size), dtype=np.float64)
+        return chunk
+
+    def _write_chunks(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            path, chunk, size = item
+            try:
+                arrays = {}
+                for name, items in chunk.items():
+                    for key, value in _named_arrays(name, items):
+                        arrays[key] = value[:size]
+                np.savez(path, **arrays)
+            except Exception as e:
+                self._error = e
+            self._free.put(chunk)
+
+    def _check_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("TrajectoryRecorder failed to write a chunk") from error
+
+    def _record(self, obs, action=None, reward=0.0, done=False, first=False, truncated=False):
+        chunk, row = self._chunk, self._row
+        write_to(self.observation_space, chunk["obs"], row, obs)
+        if action is None:
+            chunk["action"][row] = 0
+        else:
+            write_to(self.action_space, chunk["action"], row, action)
+        chunk["reward"][row] = reward
+        chunk["done"][row] = done
+        chunk["first"][row] = first
+        chunk["truncated"][row] = truncated
+        if self.record_sim_state:
+            chunk["sim_state"][row] = self.unwrapped.env.physics.get_state()
+
+        self._row += 1
+        if self._row == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Queue the rows recorded so far to be written, without waiting for the disk."""
+        self._check_error()
+        if self._row == 0:
+            return
+        path = os.path.join(self.directory, f"chunk_{self._num_chunks:05d}.npz")
+        self._pending.put((path, self._chunk, self._row))
+        self._num_chunks += 1
+        self._chunk = self._free.get()
+        self._row = 0
+
+    def reset(self, **kwargs):
+        obs = self.env.reset(**kwargs)
+        self._record(obs, first=True)
+        return obs
+
+    def step(self, action):
+        obs, reward, done, info = self.env.step(action)
+        self._record(obs, action, reward, done, truncated=info.get("TimeLimit.truncated", False))
+        return obs, reward, done, info
+
+    def close(self):
+        if self._writer.is_alive():
+            self.flush()
+            self._pending.put(None)
+            self._writer.join()
+            self._check_error()
+        return self.env.close()
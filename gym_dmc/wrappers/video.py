@@ -0,0 +1,111 @@
+import os
+import queue
+import threading
+
+import numpy as np
+
+from gym_dmc.gym.core import Wrapper
+
+
+def _has_imageio():
+    try:
+        import imageio  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class VideoRecorder(Wrapper):
+    """Renders every `stride`-th frame of an episode, and encodes the episode on a background thread
+    to `directory/episode_00000.mp4`, `episode_00001.mp4`, ...
+
+    The frame rate is `metadata["video.frames_per_second"] / stride`, so the videos play in real time.
+
+    Args:
+        directory: Where the videos are written. It is created if it does not exist.
+        stride: Render one frame every `stride` steps. The frame after `reset` is always rendered.
+        format: "mp4", which requires `imageio` with ffmpeg, or "npz" for a compressed array of the
+            frames under `frames`, with the `fps`. "auto" picks "mp4" when `imageio` is installed.
+        **render_kwargs: Passed to `env.render("rgb_array", ...)`, e.g. height, width and camera_id.
+    """
+
+    def __init__(self, env, directory, stride=1, format="auto", **render_kwargs):
+        super().__init__(env)
+        if format == "auto":
+            format = "mp4" if _has_imageio() else "npz"
+        assert format in ("mp4", "npz"), f"`{format}` is not a supported video format, use mp4 or npz"
+
+        self.directory = directory
+        self.stride = stride
+        self.format = format
+        self.render_kwargs = render_kwargs
+        self.fps = self.metadata["video.frames_per_second"] / stride
+        os.makedirs(directory, exist_ok=True)
+
+        self._frames = []
+        self._t = 0
+        self._num_videos = 0
+
+        self._error = None
+        self._pending = queue.Queue()
+        self._encoder = threading.Thread(target=self._encode_videos, daemon=True)
+        self._encoder.start()
+
+    def _encode_videos(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            path, frames = item
+            try:
+                if self.format == "mp4":
+                    import imageio
+
+                    imageio.mimwrite(path, frames, fps=self.fps)
+                else:
+                    np.savez_compressed(path, frames=np.stack(frames), fps=self.fps)
+            except Exception as e:
+                self._error = e
+
+    def _check_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("VideoRecorder failed to encode a video") from error
+
+    def _render(self):
+        # `render` returns a new array, so the frames can be handed to the encoder as they are.
+        self._frames.append(self.env.render("rgb_array", **self.render_kwargs))
+
+    def finish_video(self):
+        """Queue the frames of the current episode to be encoded, without waiting for the encoder."""
+        self._check_error()
+        if not self._frames:
+            return
+        path = os.path.join(self.directory, f"episode_{self._num_videos:05d}.{self.format}")
+        self._pending.put((path, self._frames))
+        self._num_videos += 1
+        self._frames = []
+
+    def reset(self, **kwargs):
+        self.finish_video()
+        obs = self.env.reset(**kwargs)
+        self._t = 0
+        self._render()
+        return obs
+
+    def step(self, action):
+        obs, reward, done, info = self.env.step(action)
+        self._t += 1
+        if self._t % self.stride == 0:
+            self._render()
+        if done:
+            self.finish_video()
+        return obs, reward, done, info
+
+    def close(self):
+        if self._encoder.is_alive():
+            self.finish_video()
+            self._pending.put(None)
+            self._encoder.join()
+            self._check_error()
+        return self.env.close()
@@ -0,0 +1,50 @@
+import asyncio
+
+import numpy as np
+
+import gym_dmc
+
+
+def test_env_step_async_keeps_wrappers():
+    env = gym_dmc.make("dmc:Walker-walk-v1", frame_skip=4)
+
+    async def run():
+        obs = await env.reset_async()
+        return obs, await env.step_async(env.action_space.sample())
+
+    obs, (next_obs, reward, done, info) = asyncio.run(run())
+    assert obs.shape == (24,)
+    assert next_obs.shape == (24,)
+
+
+def test_vector_env_step_async():
+    async def run(env):
+        await env.reset_async()
+        results = await env.step_async(np.zeros((2, 6)))
+        env.close()
+        return results
+
+    for vectorization in ["sync", "thread", "subproc"]:
+        env = gym_dmc.make_vec("dmc:Walker-walk-v1", num_envs=2, vectorization=vectorization)
+        obs, rewards, dones, infos = asyncio.run(run(env))
+        assert obs.shape == (2, 24)
+        assert rewards.shape == (2,)
+
+
+def test_env_step_async_pixels():
+    env = gym_dmc.make("dmc:Walker-walk-v1", from_pixels=True, frame_skip=8)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        await env.reset_async()
+        for _ in range(3):
+            # keep the default executor busy, so a step would land on another of its threads.
+            busy = loop.run_in_executor(None, sum, range(10000))
+            obs, *_ = await env.step_async(env.action_space.sample())
+            await busy
+        return obs
+
+    obs = asyncio.run(run())
+    assert obs.shape == (3, 84, 84) and obs.any()
+    env.close()
+    assert env.unwrapped._async_executor is None
@@ -0,0 +1,41 @@
+import copy
+import json
+
+from gym_dmc import bench
+
+
+def test_bench_env():
+    result = bench.bench_env("Cartpole-balance-v1", frame_skip=2, steps=20, resets=2)
+    assert result["env"] == "Cartpole-balance-v1" and result["mode"] == "state"
+    assert result["frames_per_sec"] == 2 * result["steps_per_sec"] > 0
+    assert result["reset_ms"] > 0
+
+
+def test_compare_flags_regressions():
+    baseline = dict(
+        meta={},
+        results=[
+            dict(env="Walker-walk-v1", mode="state", frame_skip=1, steps_per_sec=1000.0, reset_ms=1.0),
+            dict(env="Walker-walk-v1", mode="state", frame_skip=4, steps_per_sec=400.0, reset_ms=1.0),
+        ],
+    )
+    results = copy.deepcopy(baseline)
+    results["results"][0]["steps_per_sec"] = 850.0  # within the threshold
+    results["results"][1]["reset_ms"] = 2.0
+    results["results"].append(dict(env="Cheetah-run-v1", mode="state", frame_skip=1, steps_per_sec=1.0, reset_ms=9.0))
+
+    regressions = bench.compare(results, baseline, threshold=0.2)
+    assert [(result["frame_skip"], reasons) for result, _, reasons in regressions] == [(4, ["reset 1.00ms -> 2.00ms"])]
+
+
+def test_main_writes_json(tmp_path):
+    output = tmp_path / "results.json"
+    args = ["--envs", "Cartpole-balance-*", "--modes", "state", "--frame-skips", "1", "--steps", "10", "--resets", "1"]
+    assert bench.main(args + ["--output", str(output)]) == 0
+    results = json.loads(output.read_text())
+    assert [result["env"] for result in results["results"]] == ["Cartpole-balance-v1"]
+    assert results["meta"]["mujoco"]
+
+    results["results"][0]["steps_per_sec"] *= 100
+    output.write_text(json.dumps(results))
+    assert bench.main(args + ["--output", str(tmp_path / "new.json"), "--baseline", str(output)]) == 1
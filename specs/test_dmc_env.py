@@ -0,0 +1,172 @@
+import pickle
+
+import numpy as np
+import pytest
+
+import gym_dmc
+
+
+def test_info_is_lazy():
+    env = gym_dmc.make("dmc:Walker-walk-v1")
+    env.reset()
+    _, _, _, info = env.step(env.action_space.sample())
+    assert "sim_state" in info and "sim_state" in info._getters
+    np.testing.assert_array_equal(info["sim_state"], env.unwrapped.env.physics.get_state())
+
+    _, _, _, next_info = env.step(env.action_space.sample())
+    env.step(env.action_space.sample())
+    assert "sim_state" not in next_info
+    with pytest.raises(KeyError):
+        next_info["sim_state"]
+
+
+def test_info_pickles_as_dict():
+    env = gym_dmc.make("dmc:Walker-walk-v1", info_keys=("sim_state", "time"))
+    env.reset()
+    info = pickle.loads(pickle.dumps(env.step(env.action_space.sample())[3]))
+    assert type(info) is dict
+    assert info["time"] > 0
+
+
+def test_empty_info_keys():
+    env = gym_dmc.make("dmc:Walker-walk-v1", info_keys=())
+    env.reset()
+    assert env.step(env.action_space.sample())[3] == {}
+
+
+@pytest.mark.parametrize("eid", ["Walker-walk-v1", "Finger-turn_hard-v1", "Cartpole-swingup-v1"])
+def test_frame_skip_matches_dm_control(eid):
+    from dm_control import suite
+
+    domain_name, task_name, _ = eid.split("-")
+    env = gym_dmc.make(f"dmc:{eid}", frame_skip=4, flatten_obs=False)
+    env.seed(3)
+    reference = suite.load(domain_name.lower(), task_name, task_kwargs={"random": 3})
+
+    env.reset()
+    reference.reset()
+    actions = np.random.RandomState(0).uniform(-1, 1, size=(20, *env.action_space.shape))
+    for action in actions:
+        obs, reward, done, _ = env.step(action)
+        ref_reward = sum(reference.step(action).reward for _ in range(4))
+        assert reward == pytest.approx(ref_reward)
+    for key, value in reference._task.get_observation(reference.physics).items():
+        np.testing.assert_allclose(obs[key], value)
+
+
+def test_obs_keys_trims_observations():
+    env = gym_dmc.make("dmc:Walker-walk-v1", flatten_obs=False, obs_keys=("height", "velocity"))
+    assert list(env.observation_space.spaces) == ["height", "velocity"]
+    assert list(env.reset()) == ["height", "velocity"]
+
+    env = gym_dmc.make("dmc:Walker-walk-v1", obs_keys=("orientations",))
+    assert env.reset().shape == env.observation_space.shape == (14,)
+
+
+def test_pixels_only_skips_state_observations():
+    env = gym_dmc.make("dmc:Walker-walk-v1", from_pixels=True)
+    assert env.unwrapped._state_keys == ()
+    assert list(env.unwrapped.reset()) == ["pixels"]
+    assert env.step(env.action_space.sample())[0].shape == (3, 84, 84)
+
+
+def test_to_gray_is_integer_luminance():
+    from gym_dmc.pixels import to_gray
+
+    img = np.array([[[255, 255, 255], [255, 0, 0], [0, 255, 0], [0, 0, 255]]], dtype=np.uint8)
+    np.testing.assert_array_equal(to_gray(img), [[255, 76, 149, 28]])
+
+
+def test_render_cache():
+    env = gym_dmc.make("dmc:Walker-walk-v1", from_pixels=True)
+    obs = env.reset()
+    unwrapped = env.unwrapped
+    physics_render = unwrapped.env.physics.render
+    calls = []
+    unwrapped.env.physics.render = lambda *args, **kwargs: calls.append(kwargs) or physics_render(*args, **kwargs)
+
+    np.testing.assert_array_equal(env.render("rgb_array", camera_id=0).transpose(2, 0, 1), obs)
+    env.render("rgb_array", camera_id=0)
+    assert calls == []
+
+    # the pixel observation of the step renders once, the render call after it is free.
+    env.step(env.action_space.sample())
+    env.render("rgb_array", camera_id=0)
+    assert len(calls) == 1
+    env.render("depth", camera_id=0)
+    assert len(calls) == 2
+
+
+def test_multi_view_observation():
+    env = gym_dmc.make("dmc:Walker-walk-v1", from_pixels=True, cameras=[0, 1], modalities=["rgb", "depth", "segmentation"])
+    assert sorted(env.observation_space.spaces) == ["depth_0", "depth_1", "rgb_0", "rgb_1", "segmentation_0", "segmentation_1"]
+    obs = env.reset()
+    for key, space in env.observation_space.spaces.items():
+        assert obs[key].shape == space.shape and obs[key].dtype == space.dtype
+
+    physics = env.unwrapped.env.physics
+    np.testing.assert_array_equal(obs["rgb_1"], physics.render(84, 84, camera_id=1).transpose(2, 0, 1))
+    np.testing.assert_allclose(obs["depth_0"][0], physics.render(84, 84, camera_id=0, depth=True), rtol=1e-6)
+    np.testing.assert_array_equal(obs["segmentation_0"].transpose(1, 2, 0), physics.render(84, 84, camera_id=0, segmentation=True))
+
+
+def test_multi_view_rejects_unknown_modalities():
+    with pytest.raises(AssertionError, match="normals"):
+        gym_dmc.make("dmc:Walker-walk-v1", from_pixels=True, modalities=["rgb", "normals"])
+
+
+def test_set_state_does_not_step():
+    env = gym_dmc.make("dmc:Walker-walk-v1").unwrapped
+    env.reset()
+    state = env.env.physics.get_state()
+    env.step(env.action_space.sample())
+    step_count = env.env._step_count
+
+    env.set_state(state)
+    np.testing.assert_array_equal(env.env.physics.get_state(), state)
+    assert env.env._step_count == step_count
+
+
+@pytest.mark.parametrize("eid", ["dmc:Walker-walk-v1", "dmc:Reacher-hard-v1", "dmc:Quadruped-escape-v1"])
+def test_snapshot_restore(eid):
+    env = gym_dmc.make(eid, frame_skip=2)
+    env.seed(0)
+    env.reset()
+    env.step(env.action_space.sample())
+    snapshot = env.unwrapped.snapshot()
+
+    actions = [env.action_space.sample() for _ in range(5)]
+    expected = [env.step(action)[:3] for action in actions]
+    # a new episode randomizes the task, e.g. the target of the reacher.
+    env.reset()
+    expected_reset = env.reset()
+
+    env.unwrapped.restore(snapshot)
+    for action, (obs, reward, done) in zip(actions, expected):
+        next_obs, next_reward, next_done, _ = env.step(action)
+        np.testing.assert_array_equal(next_obs, obs)
+        assert (next_reward, next_done) == (reward, done)
+    env.reset()
+    np.testing.assert_array_equal(env.reset(), expected_reset)
+
+
+@pytest.mark.parametrize("eid", ["dmc:Walker-walk-v1", "dmc:Cartpole-swingup-v1"])
+def test_rollout_matches_step(eid):
+    env = gym_dmc.make(eid, frame_skip=2).unwrapped
+    env.seed(0)
+    env.reset()
+    snapshot = env.snapshot()
+    actions = np.random.default_rng(0).uniform(-1, 1, (3, 5, *env.action_space.shape))
+
+    rewards, observations = env.rollout(snapshot, actions, return_obs=True)
+    assert rewards.shape == (3, 5)
+    # the env is left at the snapshot
+    np.testing.assert_array_equal(env.snapshot().physics_state, snapshot.physics_state)
+
+    for k in range(3):
+        env.restore(snapshot)
+        for h in range(5):
+            obs, reward, _, _ = env.step(actions[k, h])
+            assert rewards[k, h] == reward
+            for key, value in obs.items():
+                np.testing.assert_array_equal(observations[key][k, h], value)
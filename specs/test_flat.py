@@ -0,0 +1,35 @@
+import numpy as np
+
+from gym_dmc.gym import spaces
+from gym_dmc.gym.core import Env
+from gym_dmc.wrappers.flat import FlattenObservation
+
+
+class DictEnv(Env):
+    observation_space = spaces.Dict(
+        position=spaces.Box(-1, 1, shape=(2, 3), dtype=np.float64),
+        mode=spaces.Discrete(3),
+        height=spaces.Box(-1, 1, shape=(), dtype=np.float64),
+    )
+
+    def reset(self):
+        return self.observation_space.sample()
+
+    def step(self, action):
+        return self.observation_space.sample(), 0.0, False, {}
+
+    def render(self, mode="human"):
+        pass
+
+
+def test_flatten_plan_matches_spaces_flatten():
+    env = FlattenObservation(DictEnv())
+    obs = DictEnv.observation_space.sample()
+    np.testing.assert_array_equal(env.observation(obs), spaces.flatten(DictEnv.observation_space, obs))
+    assert env.observation(obs).shape == env.observation_space.shape == (10,)
+
+
+def test_flatten_view_mode_reuses_buffer():
+    env = FlattenObservation(DictEnv(), copy=False)
+    first = env.reset()
+    assert env.step(None)[0] is first
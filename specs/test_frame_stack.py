@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+import gym_dmc
+from gym_dmc.gym import spaces
+from gym_dmc.gym.core import Env
+from gym_dmc.wrappers.frame_stack import FrameStack
+
+
+class CountingEnv(Env):
+    def __init__(self, shape, channels_first=True):
+        self.channels_first = channels_first
+        self.observation_space = spaces.Box(0, 255, shape=shape, dtype=np.uint8)
+        self.t = 0
+
+    def reset(self):
+        self.t = 0
+        return np.full(self.observation_space.shape, self.t, dtype=np.uint8)
+
+    def step(self, action):
+        self.t += 1
+        return np.full(self.observation_space.shape, self.t, dtype=np.uint8), 0.0, False, {}
+
+    def render(self, mode="human"):
+        pass
+
+
+@pytest.mark.parametrize("shape, channels_first, axis", [((2, 4, 4), True, 0), ((4, 4, 2), False, -1), ((3,), True, 0)])
+@pytest.mark.parametrize("copy", [True, False])
+def test_frame_stack_matches_concatenate(shape, channels_first, axis, copy):
+    env = FrameStack(CountingEnv(shape, channels_first), k=3, copy=copy)
+    history = [env.env.reset()] * 3
+    obs = env.reset()
+    assert obs.shape == env.observation_space.shape
+    for _ in range(7):
+        np.testing.assert_array_equal(obs, np.concatenate(history[-3:], axis=axis))
+        obs, *_ = env.step(None)
+        history.append(np.full(shape, env.env.t, dtype=np.uint8))
+
+
+def test_frame_stack_pixels():
+    env = gym_dmc.make("dmc:Walker-walk-v1", from_pixels=True, gray_scale=True, frame_stack=3)
+    assert env.reset().shape == env.observation_space.shape == (3, 84, 84)
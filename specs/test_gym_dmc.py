@@ -50,3 +50,18 @@ def test_gray_scale():
     )
     assert env.spec.max_episode_steps == 125
     assert env.reset().shape == (84, 84, 1)
+
+
+def test_crop_and_resize():
+    env = gym_dmc.make(
+        "dmc:Walker-walk-v1",
+        from_pixels=True,
+        height=100,
+        width=120,
+        crop=(0, 10, 100, 100),
+        resize=(64, 64),
+        gray_scale=True,
+    )
+    assert env.observation_space.shape == (1, 64, 64)
+    obs = env.reset()
+    assert obs.shape == (1, 64, 64) and obs.flags.c_contiguous
@@ -0,0 +1,102 @@
+import os
+import threading
+
+import numpy as np
+
+import gym_dmc
+from gym_dmc import model_cache
+
+
+def test_disk_model_cache(tmp_path):
+    env = gym_dmc.make("dmc:Cartpole-two_poles-v1", model_cache=str(tmp_path))
+    (cached,) = os.listdir(tmp_path)
+    assert cached.endswith(".mjb")
+
+    # a task whose xml differs gets its own entry
+    gym_dmc.make("dmc:Cartpole-three_poles-v1", model_cache=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 2
+
+    from_cache = gym_dmc.make("dmc:Cartpole-two_poles-v1", model_cache=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 2
+
+    fresh, cached = env.unwrapped.env.physics.model, from_cache.unwrapped.env.physics.model
+    assert fresh.nq == cached.nq
+    np.testing.assert_array_equal(fresh.body_mass, cached.body_mass)
+
+    env.seed(0)
+    from_cache.seed(0)
+    np.testing.assert_array_equal(env.reset(), from_cache.reset())
+    action = env.action_space.sample()
+    np.testing.assert_array_equal(env.step(action)[0], from_cache.step(action)[0])
+
+
+def test_corrupt_cache_entry_is_rebuilt(tmp_path):
+    gym_dmc.make("dmc:Walker-walk-v1", model_cache=str(tmp_path))
+    (cached,) = os.listdir(tmp_path)
+    with open(tmp_path / cached, "wb") as f:
+        f.write(b"truncated")
+
+    env = gym_dmc.make("dmc:Walker-walk-v1", model_cache=str(tmp_path))
+    assert env.reset().shape == (24,)
+    assert os.path.getsize(tmp_path / cached) > 1000
+
+
+def test_shared_model():
+    import pytest
+
+    envs = [gym_dmc.make("dmc:Walker-walk-v1", share_model=True) for _ in range(3)]
+    physics = [env.unwrapped.env.physics for env in envs]
+    assert physics[0].model.ptr is physics[1].model.ptr is physics[2].model.ptr
+    assert physics[0].data.ptr is not physics[1].data.ptr
+
+    own = gym_dmc.make("dmc:Walker-walk-v1")
+    assert own.unwrapped.env.physics.model.ptr is not physics[0].model.ptr
+
+    # each env keeps its own state
+    envs[0].seed(0)
+    envs[1].seed(1)
+    assert not np.array_equal(envs[0].reset(), envs[1].reset())
+
+    with pytest.raises(ValueError):
+        gym_dmc.make("dmc:Reacher-easy-v1", share_model=True)
+    with pytest.raises(ValueError, match="visualize_reward"):
+        gym_dmc.make("dmc:Walker-walk-v1", share_model=True, visualize_reward=True)
+
+
+def test_cached_load_does_not_touch_other_loads():
+    from dm_control import suite
+    from dm_control.mujoco import engine
+    from dm_control.suite import cartpole
+
+    calls = []
+    compiling, release = threading.Event(), threading.Event()
+
+    def slow_compile(xml_string, assets=None):
+        calls.append(xml_string)
+        compiling.set()
+        release.wait(10)
+        return model_cache._compile(xml_string, assets)
+
+    from_xml_string = engine.Physics.__dict__["from_xml_string"]
+    loaded = {}
+    loader = threading.Thread(target=lambda: loaded.update(env=model_cache.task_builder(cartpole, "balance", slow_compile)()))
+    loader.start()
+    compiling.wait(10)
+
+    # a plain load neither waits for the cached one, nor compiles through it.
+    assert suite.load("cartpole", "swingup").physics.model.nq == 2
+    assert engine.Physics.__dict__["from_xml_string"] is from_xml_string
+    release.set()
+    loader.join(10)
+    assert len(calls) == 1
+    assert type(loaded["env"].physics) is cartpole.Physics
+
+
+def test_random_models_are_not_cached(tmp_path):
+    import pytest
+
+    env = model_cache.load("lqr", "lqr_2_1", cache_dir=str(tmp_path))
+    assert env.reset().observation["position"].shape == (2,)
+    assert os.listdir(tmp_path) == []
+    with pytest.raises(ValueError, match="random model"):
+        model_cache.load("lqr", "lqr_2_1", share_model=True)
@@ -0,0 +1,38 @@
+import gym_dmc
+from gym_dmc.perf import disable_perf_stats, enable_perf_stats
+from gym_dmc.wrappers.order_enforcing import OrderEnforcing
+from gym_dmc.wrappers.time_limit import TimeLimit
+
+
+def test_perf_stats_phases():
+    env = OrderEnforcing(TimeLimit(gym_dmc.make("dmc:Walker-walk-v1", frame_skip=2), 100))
+    assert env.perf_stats() is None
+
+    enable_perf_stats(env)
+    env.reset()
+    for _ in range(5):
+        env.step(env.action_space.sample())
+
+    stats = env.perf_stats()
+    assert stats["physics"]["calls"] == 10
+    assert stats["observation"]["calls"] == 6  # including reset
+    assert stats["flatten"]["calls"] == 6
+    for layer in ["OrderEnforcing", "TimeLimit", "FlattenObservation", "DMCEnv"]:
+        assert stats[f"step.{layer}"]["calls"] == 5
+    for wrapper in ["OrderEnforcing", "TimeLimit", "FlattenObservation"]:
+        assert 0 < stats[f"wrapper.{wrapper}"]["total"] < stats["step.DMCEnv"]["total"]
+    assert stats["step.DMCEnv"]["total"] > stats["physics"]["total"]
+
+    disable_perf_stats(env)
+    assert env.perf_stats() is None
+    assert "step" not in vars(env) and "step" not in vars(env.unwrapped)
+
+
+def test_perf_stats_pixels():
+    env = gym_dmc.make("dmc:Walker-walk-v1", from_pixels=True, gray_scale=True, perf_stats=True)
+    env.reset()
+    env.step(env.action_space.sample())
+
+    stats = env.perf_stats()
+    assert stats["render"]["calls"] == stats["pixels"]["calls"] == 2
+    assert env.reset().shape == (1, 84, 84)
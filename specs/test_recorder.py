@@ -0,0 +1,54 @@
+import glob
+import os
+
+import numpy as np
+
+import gym_dmc
+from gym_dmc.wrappers.recorder import TrajectoryRecorder
+from gym_dmc.wrappers.time_limit import TimeLimit
+
+
+def load_chunks(directory):
+    chunks = [np.load(path) for path in sorted(glob.glob(os.path.join(directory, "chunk_*.npz")))]
+    return {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0].files}
+
+
+def test_recorder_streams_every_transition(tmp_path):
+    env = TimeLimit(gym_dmc.make("dmc:Cartpole-balance-v1"), max_episode_steps=25)
+    env = TrajectoryRecorder(env, str(tmp_path), chunk_size=16, record_sim_state=True)
+
+    observations, actions, rewards = [], [], []
+    for episode in range(2):
+        observations.append(env.reset())
+        done = False
+        while not done:
+            action = env.action_space.sample()
+            obs, reward, done, info = env.step(action)
+            observations.append(obs)
+            actions.append(action)
+            rewards.append(reward)
+    env.close()
+
+    data = load_chunks(str(tmp_path))
+    assert len(glob.glob(os.path.join(str(tmp_path), "chunk_*.npz"))) == 4  # 52 rows in chunks of 16
+    np.testing.assert_array_equal(data["obs"], observations)
+    first = data["first"]
+    assert first.sum() == 2 and first[0] and first[26]
+    np.testing.assert_array_equal(data["action"][~first], actions)
+    np.testing.assert_array_equal(data["reward"][~first], rewards)
+    assert data["done"].sum() == 2 and data["truncated"].sum() == 2
+    assert data["sim_state"].shape == (52, 4)
+
+
+def test_recorder_dict_observation(tmp_path):
+    env = gym_dmc.make("dmc:Cartpole-balance-v1", flatten_obs=False)
+    env = TrajectoryRecorder(env, str(tmp_path), chunk_size=8)
+    obs = env.reset()
+    for _ in range(3):
+        env.step(env.action_space.sample())
+    env.close()
+
+    data = load_chunks(str(tmp_path))
+    assert sorted(data) == ["action", "done", "first", "obs.position", "obs.velocity", "reward", "truncated"]
+    np.testing.assert_array_equal(data["obs.position"][0], obs["position"])
+    assert len(data["reward"]) == 4
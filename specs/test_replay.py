@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+import pytest
+
+import gym_dmc
+from gym_dmc.replay import PixelReplayBuffer
+
+
+def fill(buffer, episode_lengths):
+    """Frames hold their own frame id, so that stacks can be checked."""
+    frame_id = 0
+    for length in episode_lengths:
+        buffer.add_first(np.full(buffer.frame_shape, frame_id, dtype=np.uint8))
+        for t in range(length):
+            frame_id += 1
+            buffer.add(np.full(2, frame_id), frame_id, np.full(buffer.frame_shape, frame_id, dtype=np.uint8), t == length - 1)
+        frame_id += 1
+
+
+@pytest.mark.parametrize("channels_first", [True, False])
+def test_replay_stacks_within_episodes(tmp_path, channels_first):
+    frame_shape = (1, 2, 2) if channels_first else (2, 2, 1)
+    buffer = PixelReplayBuffer(100, frame_shape, (2,), frame_stack=3, channels_first=channels_first, path=str(tmp_path), seed=0)
+    fill(buffer, [5, 4])
+    assert len(buffer) == 9
+
+    batch = buffer.sample(64)
+    for obs, next_obs, reward in zip(batch["obs"], batch["next_obs"], batch["reward"]):
+        obs_ids = obs[:, 0, 0] if channels_first else obs[0, 0, :]
+        next_ids = next_obs[:, 0, 0] if channels_first else next_obs[0, 0, :]
+        assert next_ids[-1] == reward
+        assert obs_ids[-1] == reward - 1
+        # episode two starts at frame 6, stacks never reach into episode one.
+        assert (obs_ids >= (6 if reward > 6 else 0)).all()
+        np.testing.assert_array_equal(next_ids[:-1], obs_ids[1:])
+
+
+def test_replay_wraps_around(tmp_path):
+    buffer = PixelReplayBuffer(8, (1, 1, 1), (2,), frame_stack=2, path=str(tmp_path), seed=0)
+    fill(buffer, [20])
+    batch = buffer.sample(32)
+    assert (batch["obs"][:, :, 0, 0] >= 13).all()
+    assert len(buffer) == 7
+
+
+def test_replay_from_env(tmp_path):
+    env = gym_dmc.make("dmc:Walker-walk-v1", from_pixels=True, frame_skip=4, frame_stack=3)
+    buffer = PixelReplayBuffer.from_env(env, capacity=10, path=str(tmp_path))
+    assert buffer.metadata["frame_skip"] == 4 and buffer.frame_stack == 3
+    buffer.add_first(env.reset())
+    action = env.action_space.sample()
+    next_obs, reward, done, _ = env.step(action)
+    buffer.add(action, reward, next_obs, done)
+    np.testing.assert_array_equal(buffer.sample(1)["next_obs"][0], next_obs)
+
+
+def test_replay_close_removes_temporary_directory(tmp_path):
+    with PixelReplayBuffer(10, (1, 2, 2), (2,), seed=0) as buffer:
+        fill(buffer, [3])
+        path = buffer.path
+        assert os.path.exists(os.path.join(path, "frames.npy"))
+    assert not os.path.exists(path)
+
+    buffer = PixelReplayBuffer(10, (1, 2, 2), (2,), path=str(tmp_path), seed=0)
+    fill(buffer, [3])
+    buffer.close()
+    buffer.close()
+    assert np.load(tmp_path / "frames.npy")[3].max() == 3
@@ -0,0 +1,187 @@
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+from gym_dmc import bench_spaces
+from gym_dmc.gym import spaces
+
+
+def _reference_sample(box):
+    """The sampling of `Box.sample` before its masks were cached."""
+    high = box.high if box.dtype.kind == "f" else box.high.astype("int64") + 1
+    sample = np.empty(box.shape)
+    unbounded = ~box.bounded_below & ~box.bounded_above
+    upp_bounded = ~box.bounded_below & box.bounded_above
+    low_bounded = box.bounded_below & ~box.bounded_above
+    bounded = box.bounded_below & box.bounded_above
+    sample[unbounded] = box.np_random.normal(size=unbounded[unbounded].shape)
+    sample[low_bounded] = box.np_random.exponential(size=low_bounded[low_bounded].shape) + box.low[low_bounded]
+    sample[upp_bounded] = -box.np_random.exponential(size=upp_bounded[upp_bounded].shape) + box.high[upp_bounded]
+    sample[bounded] = box.np_random.uniform(low=box.low[bounded], high=high[bounded], size=bounded[bounded].shape)
+    if box.dtype.kind == "i":
+        sample = np.floor(sample)
+    return sample.astype(box.dtype)
+
+
+def _boxes(seed):
+    return [
+        spaces.Box(-1.0, 1.0, shape=(6,), dtype=np.float32, seed=seed),
+        spaces.Box(
+            low=np.array([-1.0, -np.inf, 0.0, -np.inf] * 6),
+            high=np.array([1.0, np.inf, np.inf, 0.0] * 6),
+            dtype=np.float64,
+            seed=seed,
+        ),
+        spaces.Box(0, 255, shape=(3, 8, 8), dtype=np.uint8, seed=seed),
+        spaces.Box(-5, 5, shape=(2, 3), dtype=np.int64, seed=seed),
+    ]
+
+
+def test_box_sample_draws_the_same_numbers():
+    for box, reference in zip(_boxes(0), _boxes(0)):
+        for _ in range(3):
+            sample, expected = box.sample(), _reference_sample(reference)
+            assert sample.dtype == expected.dtype
+            np.testing.assert_array_equal(sample, expected)
+
+
+def test_box_sample_follows_new_bounds():
+    box = spaces.Box(-1.0, 1.0, shape=(4,), seed=0)
+    box.sample()
+    box.low = np.full(4, 10.0, dtype=np.float32)
+    box.high = np.full(4, 11.0, dtype=np.float32)
+    assert ((10.0 <= box.sample()) & (box.sample() <= 11.0)).all()
+
+    box.bounded_above = np.zeros(4, dtype=bool)
+    assert all((box.sample() >= 10.0).all() for _ in range(10))
+
+
+def test_box_bounds_are_read_only():
+    import copy
+
+    import pytest
+
+    box = spaces.Box(low=np.array([-1.0, 0.0]), high=np.array([1.0, np.inf]), seed=0)
+    for edit in (
+        lambda: box.low.__setitem__(0, 5.0),
+        lambda: box.high.__setitem__(0, 6.0),
+        lambda: box.bounded_above.__setitem__(slice(None), False),
+        lambda: copy.deepcopy(spaces.Box(-1.0, 1.0, shape=(2,))).low.__setitem__(0, 5.0),
+    ):
+        with pytest.raises(ValueError, match="read-only"):
+            edit()
+
+    box.low = np.array([5.0, 0.0])
+    box.high = np.array([6.0, np.inf])
+    assert all(5.0 <= box.sample()[0] <= 6.0 for _ in range(10))
+
+
+def test_box_setstate_accepts_legacy_state():
+    box = spaces.Box(-1.0, 1.0, shape=(2,))
+    state = {
+        "dtype": box.dtype,
+        "_shape": box.shape,
+        "_np_random": None,
+        "low": box.low,
+        "high": box.high,
+        "bounded_below": box.bounded_below,
+        "bounded_above": box.bounded_above,
+    }
+    restored = spaces.Box.__new__(spaces.Box)
+    restored.__setstate__(state)
+    assert restored == box and restored.sample() in box
+
+
+def test_box_contains_casts_lists():
+    box = spaces.Box(-1.0, 1.0, shape=(2,))
+    assert box.contains([0.5, -0.5])
+    assert not box.contains(np.array([0.5, 2.0], dtype=np.float32))
+    assert not box.contains(np.zeros(2, dtype=np.complex64))
+
+
+def test_flatten_round_trip():
+    multi_discrete = spaces.MultiDiscrete([[5, 2], [2, 7]], seed=0)
+    space = spaces.Dict(
+        OrderedDict(
+            position=spaces.Box(-1.0, 1.0, shape=(2, 3), seed=0),
+            mode=spaces.Discrete(4, start=1, seed=0),
+            parts=spaces.Tuple((spaces.MultiBinary(3, seed=0), multi_discrete)),
+        )
+    )
+    for _ in range(5):
+        x = space.sample()
+        flat = spaces.flatten(space, x)
+        assert flat.shape == (spaces.flatdim(space),)
+        y = spaces.unflatten(space, flat)
+        np.testing.assert_array_equal(y["position"], x["position"])
+        assert y["mode"] == x["mode"]
+        np.testing.assert_array_equal(y["parts"][0], x["parts"][0])
+        np.testing.assert_array_equal(y["parts"][1], x["parts"][1])
+
+    # the cached column slices follow a replaced subspace.
+    space["mode"] = spaces.Discrete(6, seed=0)
+    x = space.sample()
+    assert spaces.flatdim(space) == 6 + 6 + 3 + 16
+    assert spaces.unflatten(space, spaces.flatten(space, x))["mode"] == x["mode"]
+
+    # a new `nvec` is not flattened with the offsets of the old one.
+    multi_discrete.nvec = np.array([3, 3])
+    assert spaces.flatten(multi_discrete, np.array([2, 1])).tolist() == [0, 0, 1, 0, 1, 0]
+
+
+def test_bench_spaces(tmp_path):
+    output = tmp_path / "spaces.json"
+    assert bench_spaces.main(["--cases", "flatdim[Dict]", "--number", "10", "--output", str(output)]) == 0
+    results = json.loads(output.read_text())
+    assert [result["name"] for result in results["results"]] == ["flatdim[Dict]"]
+
+    results["results"][0]["us_per_call"] /= 100
+    output.write_text(json.dumps(results))
+    assert bench_spaces.main(["--cases", "flatdim[Dict]", "--number", "10", "--baseline", str(output)]) == 1
+
+
+def _nested_space(seed=0):
+    return spaces.Dict(
+        OrderedDict(
+            position=spaces.Box(-1.0, 1.0, shape=(2, 3), seed=seed),
+            velocity=spaces.Box(np.array([-1.0, -np.inf, 0.0]), np.array([1.0, np.inf, np.inf]), seed=seed),
+            mode=spaces.Discrete(4, start=1, seed=seed),
+            parts=spaces.Tuple((spaces.MultiBinary([2, 2], seed=seed), spaces.MultiDiscrete([[5, 2], [2, 7]], seed=seed))),
+        )
+    )
+
+
+def _row(x, i):
+    if isinstance(x, dict):
+        return OrderedDict((key, _row(value, i)) for key, value in x.items())
+    if isinstance(x, tuple):
+        return tuple(_row(value, i) for value in x)
+    return x[i]
+
+
+def test_sample_n():
+    space = _nested_space()
+    batch = space.sample(50)
+    assert batch["position"].shape == (50, 2, 3) and batch["position"].dtype == np.float32
+    assert batch["mode"].shape == (50,) and batch["parts"][1].shape == (50, 2, 2)
+    assert all(_row(batch, i) in space for i in range(50))
+
+    # a bounded box draws the same numbers batched as one by one.
+    one_by_one, batched = spaces.Box(-1.0, 1.0, shape=(6,), seed=0), spaces.Box(-1.0, 1.0, shape=(6,), seed=0)
+    np.testing.assert_array_equal(batched.sample(3), [one_by_one.sample() for _ in range(3)])
+
+
+def test_batch_flatten_round_trip():
+    space = _nested_space()
+    batch = space.sample(20)
+    flat = spaces.batch_flatten(space, batch)
+    assert flat.shape == (20, spaces.flatdim(space))
+    for i in range(20):
+        np.testing.assert_array_equal(flat[i], spaces.flatten(space, _row(batch, i)))
+
+    unflat = spaces.batch_unflatten(space, flat)
+    for key in ("position", "velocity", "mode"):
+        np.testing.assert_array_equal(unflat[key], batch[key])
+    for value, expected in zip(unflat["parts"], batch["parts"]):
+        np.testing.assert_array_equal(value, expected)
@@ -0,0 +1,30 @@
+import subprocess
+import sys
+
+import gym_dmc
+from gym_dmc.tasks import ALL_TASKS
+
+
+def test_task_table_matches_suite():
+    from dm_control import suite
+
+    assert ALL_TASKS == tuple(suite.ALL_TASKS)
+    assert len(gym_dmc.ALL_ENVS) == len(ALL_TASKS)
+
+
+IMPORT_BENCHMARK = """
+import sys, time
+
+t0 = time.perf_counter()
+import gym_dmc
+elapsed = time.perf_counter() - t0
+
+assert not any(name.split(".")[0] in ("dm_control", "mujoco") for name in sys.modules), "dm_control imported"
+print(elapsed)
+"""
+
+
+def test_import_does_not_load_dm_control():
+    elapsed = float(subprocess.check_output([sys.executable, "-c", IMPORT_BENCHMARK], text=True))
+    # about 0.2s, mostly numpy. Importing dm_control.suite used to take another second.
+    assert elapsed < 1.0, f"`import gym_dmc` took {elapsed:.3f}s"
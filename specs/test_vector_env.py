@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+import gym_dmc
+
+
+def test_sync_vector_env_shapes():
+    env = gym_dmc.make_vec("dmc:Walker-walk-v1", num_envs=3, frame_skip=4)
+    obs = env.reset()
+    assert obs.shape == (3, 24)
+    assert env.action_space.shape == (3, 6)
+
+    obs, rewards, dones, infos = env.step(env.action_space.sample())
+    assert obs.shape == (3, 24)
+    assert rewards.shape == (3,) and rewards.dtype == np.float64
+    assert dones.shape == (3,) and dones.dtype == np.bool_
+    assert len(infos) == 3
+
+
+def test_sync_vector_env_reuses_buffers():
+    env = gym_dmc.make_vec("dmc:Walker-walk-v1", num_envs=2)
+    env.copy = False
+    obs = env.reset()
+    next_obs, rewards, *_ = env.step(env.action_space.sample())
+    assert next_obs is obs
+    assert env.step(env.action_space.sample())[1] is rewards
+
+
+def test_sync_vector_env_autoreset():
+    env = gym_dmc.make_vec("dmc:Cartpole-balance-v1", num_envs=2, frame_skip=250)
+    env.reset()
+    for _ in range(4):
+        obs, rewards, dones, infos = env.step(np.zeros((2, 1)))
+    assert dones.all()
+    assert infos[0]["terminal_observation"].shape == (5,)
+
+
+def test_subproc_vector_env_state():
+    env = gym_dmc.make_vec("dmc:Walker-walk-v1", num_envs=2, vectorization="subproc", frame_skip=4)
+    assert env.reset().shape == (2, 24)
+    obs, rewards, dones, infos = env.step(env.action_space.sample())
+    assert obs.shape == (2, 24)
+    assert rewards.shape == (2,)
+    assert "sim_state" in infos[1]
+    env.close()
+
+
+def test_subproc_vector_env_pixels():
+    env = gym_dmc.make_vec("dmc:Walker-walk-v1", num_envs=2, vectorization="subproc", from_pixels=True, frame_skip=8)
+    obs = env.reset()
+    assert obs.shape == (2, 3, 84, 84) and obs.dtype == np.uint8
+    obs, *_ = env.step(env.action_space.sample())
+    assert obs.any()
+    env.close()
+
+
+def test_thread_vector_env_matches_sync():
+    sync_env = gym_dmc.make_vec("dmc:Walker-walk-v1", num_envs=2)
+    thread_env = gym_dmc.make_vec("dmc:Walker-walk-v1", num_envs=2, vectorization="thread")
+    sync_env.seed(5), thread_env.seed(5)
+    np.testing.assert_allclose(sync_env.reset(), thread_env.reset())
+
+    actions = np.full((2, 6), 0.5)
+    for _ in range(5):
+        sync_step, thread_step = sync_env.step(actions), thread_env.step(actions)
+    np.testing.assert_allclose(sync_step[0], thread_step[0])
+    np.testing.assert_allclose(sync_step[1], thread_step[1])
+    thread_env.close()
+
+
+def test_thread_vector_env_pixels():
+    env = gym_dmc.make_vec("dmc:Walker-walk-v1", num_envs=3, vectorization="thread", from_pixels=True, frame_skip=8)
+    obs = env.reset()
+    assert obs.shape == (3, 3, 84, 84) and obs.dtype == np.uint8
+    for _ in range(3):
+        obs, *_ = env.step(env.action_space.sample())
+    assert obs.any()
+    env.close()
+
+
+def test_subproc_vector_env_partial_batches():
+    env = gym_dmc.make_vec("dmc:Walker-walk-v1", num_envs=4, vectorization="subproc")
+    env.reset()
+    env.send(np.zeros((4, 6)))
+    obs, rewards, dones, infos, env_ids = env.recv(min_ready=2)
+    assert obs.shape == (2, 24) and rewards.shape == (2,) and len(infos) == 2
+    assert len(set(env_ids)) == 2
+
+    env.send(np.zeros((2, 6)), env_ids)
+    obs, rewards, dones, infos, all_ids = env.recv()
+    assert obs.shape == (4, 24)
+    assert sorted(all_ids) == [0, 1, 2, 3]
+
+    for actions, env_ids in [(np.zeros((1, 6)), [0, 1]), (np.zeros((2, 6)), [1, 1]), (np.zeros((1, 6)), [4])]:
+        with pytest.raises(ValueError):
+            env.send(actions, env_ids)
+    env.send(np.zeros((1, 6)), [2])
+    with pytest.raises(ValueError, match="still stepping"):
+        env.send(np.zeros((2, 6)), [0, 2])
+    # nothing was sent to env 0 by the failed call
+    assert list(env.recv()[4]) == [2]
+    env.close()
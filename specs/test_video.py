@@ -0,0 +1,25 @@
+import numpy as np
+
+import gym_dmc
+from gym_dmc.wrappers.time_limit import TimeLimit
+from gym_dmc.wrappers.video import VideoRecorder
+
+
+def test_video_recorder(tmp_path):
+    env = TimeLimit(gym_dmc.make("dmc:Cartpole-balance-v1"), max_episode_steps=10)
+    env = VideoRecorder(env, str(tmp_path), stride=3, format="npz", height=32, width=48)
+    assert env.fps == env.metadata["video.frames_per_second"] / 3
+
+    for _ in range(2):
+        env.reset()
+        done = False
+        while not done:
+            _, _, done, _ = env.step(env.action_space.sample())
+    env.close()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["episode_00000.npz", "episode_00001.npz"]
+    video = np.load(tmp_path / "episode_00000.npz")
+    # the frame after reset, and after steps 3, 6 and 9
+    assert video["frames"].shape == (4, 32, 48, 3)
+    assert video["frames"].dtype == np.uint8
+    assert video["fps"] == env.fps